@@ -1,8 +1,29 @@
 import os
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
+def _resolve_database_path(database_url: str) -> Path:
+    """Resolve (and create the parent directory of) the database path once per URL"""
+    if database_url:
+        # Extract path from sqlite URL
+        return Path(database_url.replace("sqlite+aiosqlite:///", ""))
+
+    # Default to user data directory
+    if os.name == "nt":  # Windows
+        base = Path(os.environ.get("APPDATA", ""))
+    elif os.name == "darwin":  # macOS
+        base = Path.home() / "Library" / "Application Support"
+    else:  # Linux
+        base = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share"))
+
+    data_dir = base / "com.autotest.ai"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir / "autotest.db"
+
+
 class Settings(BaseSettings):
     """Application settings"""
 
@@ -17,39 +38,35 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = ""
+    db_pool_size: int = 20
+    db_max_overflow: int = 30
+    db_pool_timeout: float = 10.0
 
     # AI Services
     anthropic_api_key: str = ""
     ai_agent_url: str = "http://127.0.0.1:8001"
     test_runner_url: str = "http://127.0.0.1:8002"
 
+    # Test runner
+    node_modules_path: str = ""
+
     # External integrations
     github_token: str = ""
     jira_base_url: str = ""
     jira_email: str = ""
     jira_api_token: str = ""
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", frozen=True)
 
     def get_database_path(self) -> Path:
         """Get the database path, using platform-specific data directory"""
-        if self.database_url:
-            # Extract path from sqlite URL
-            return Path(self.database_url.replace("sqlite+aiosqlite:///", ""))
+        return _resolve_database_path(self.database_url)
 
-        # Default to user data directory
-        if os.name == "nt":  # Windows
-            base = Path(os.environ.get("APPDATA", ""))
-        elif os.name == "darwin":  # macOS
-            base = Path.home() / "Library" / "Application Support"
-        else:  # Linux
-            base = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share"))
 
-        data_dir = base / "com.autotest.ai"
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir / "autotest.db"
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings from the environment once per process"""
+    return Settings()
 
 
-settings = Settings()
+settings = get_settings()
@@ -1,3 +1,3 @@
-from .database import get_db, init_db, engine, AsyncSessionLocal
+from .database import get_db, init_db, engine, AsyncSessionLocal, generate_id, utcnow
 
-__all__ = ["get_db", "init_db", "engine", "AsyncSessionLocal"]
+__all__ = ["get_db", "init_db", "engine", "AsyncSessionLocal", "generate_id", "utcnow"]
@@ -1,3 +1,11 @@
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+from sqlalchemy import String, event, literal_column
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
@@ -8,6 +16,45 @@ class Base(DeclarativeBase):
     pass
 
 
+# Column type for primary and foreign keys: canonical 36-character UUID strings
+ID_TYPE = String(36)
+
+
+def utcnow() -> datetime:
+    """Current UTC time for created/updated column defaults
+
+    Naive, like the DateTime columns it fills and the values read back from
+    SQLite, so a freshly created object serializes the same as a fetched row.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def generate_id() -> str:
+    """Generate a time-ordered UUIDv7 string for primary keys
+
+    New rows sort after existing ones, so primary key index inserts append
+    instead of landing on random B-tree pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
+# Current UTC time evaluated by SQLite, in SQLAlchemy's DateTime storage format
+UTCNOW_SQL = literal_column("strftime('%Y-%m-%d %H:%M:%f000', 'now')")
+
+# SQLite expression producing the same UUIDv7 layout per row, for server-side
+# INSERT ... SELECT statements that never bring rows into Python
+GENERATE_ID_SQL = literal_column("""printf('%08x-%04x-7%s-%s%s-%s',
+    CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER) >> 16,
+    CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER) & 65535,
+    substr(lower(hex(randomblob(2))), 2),
+    substr('89ab', 1 + (random() & 3), 1),
+    substr(lower(hex(randomblob(2))), 2),
+    lower(hex(randomblob(6))))""")
+
+
 # Create async engine
 db_path = settings.get_database_path()
 DATABASE_URL = f"sqlite+aiosqlite:///{db_path}"
@@ -16,8 +63,27 @@ engine = create_async_engine(
     DATABASE_URL,
     echo=settings.debug,
     connect_args={"check_same_thread": False},
+    # Sized for concurrent requests; a local file has no server-side idle
+    # timeouts, so pre-ping and recycling would only add overhead
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
 )
 
+
+@event.listens_for(engine.sync_engine, "connect")
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    """Turn on foreign keys, which SQLite leaves off per connection
+
+    Without this, the ON DELETE CASCADE clauses on child tables are ignored.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -25,10 +91,75 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+def _create_missing_indexes(connection):
+    """Create indexes added to existing tables, which create_all skips"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+# FTS5 trigram index over project name/description, kept in sync by triggers.
+# Trigram tokens let substring searches ("%query%") use the index. Rows are keyed
+# by the project id rather than projects' implicit rowid, which VACUUM may renumber.
+PROJECT_SEARCH_DDL = (
+    """CREATE VIRTUAL TABLE projects_search USING fts5(
+        project_id UNINDEXED, name, description, tokenize='trigram'
+    )""",
+    """CREATE TRIGGER projects_search_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_search(project_id, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    """CREATE TRIGGER projects_search_ad AFTER DELETE ON projects BEGIN
+        DELETE FROM projects_search WHERE project_id = old.id;
+    END""",
+    """CREATE TRIGGER projects_search_au AFTER UPDATE ON projects BEGIN
+        DELETE FROM projects_search WHERE project_id = old.id;
+        INSERT INTO projects_search(project_id, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    # Index rows that existed before the search table was added
+    """INSERT INTO projects_search(project_id, name, description)
+        SELECT id, name, description FROM projects""",
+)
+
+# Drops an earlier rowid-keyed version of the index before it is rebuilt
+DROP_PROJECT_SEARCH_DDL = (
+    "DROP TRIGGER IF EXISTS projects_search_ai",
+    "DROP TRIGGER IF EXISTS projects_search_ad",
+    "DROP TRIGGER IF EXISTS projects_search_au",
+    "DROP TABLE IF EXISTS projects_search",
+)
+
+# Set by init_db; without FTS5 or its trigram tokenizer, search falls back to ILIKE
+project_search_available = False
+
+
+def _create_project_search_index(connection):
+    """Create (or upgrade) the project search index, if this SQLite build supports it"""
+    global project_search_available
+    row = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE name = 'projects_search'"
+    ).first()
+    if row is not None and "project_id" in row[0]:
+        project_search_available = True
+        return
+
+    try:
+        for statement in DROP_PROJECT_SEARCH_DDL + PROJECT_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+    except OperationalError as e:
+        # "no such module: fts5" / "no such tokenizer: trigram"
+        print(f"Project search index unavailable, using ILIKE search: {e.orig}")
+        return
+    project_search_available = True
+
+
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.run_sync(_create_project_search_index)
 
 
 async def get_db():
@@ -1,11 +1,13 @@
 import platform
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import ORJSONResponse
 
 from app.config import settings
 from app.db import init_db
+from app.middleware import CORSMiddleware
+from app.services.http_client import create_http_client
 from app.routers import (
     projects_router,
     test_cases_router,
@@ -20,6 +22,22 @@ from app.routers import (
     test_runner_router,
 )
 
+# Static per-process info, computed once instead of on every request
+PLATFORM = platform.system().lower()
+
+HEALTH_INFO = {
+    "status": "healthy",
+    "service": settings.app_name,
+    "version": settings.app_version,
+}
+
+APP_INFO = {
+    "name": settings.app_name,
+    "version": settings.app_version,
+    "platform": PLATFORM,
+    "arch": platform.machine(),
+}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -28,65 +46,64 @@ async def lifespan(app: FastAPI):
     print(f"Starting {settings.app_name} v{settings.app_version}")
     print(f"Database: {settings.get_database_path()}")
     await init_db()
-    yield
-    # Shutdown
-    print("Shutting down...")
+    app.state.http = create_http_client()
+    try:
+        yield
+    finally:
+        # Shutdown
+        print("Shutting down...")
+        await app.state.http.aclose()
 
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    # Interactive docs and the OpenAPI schema are only served in debug mode
+    openapi_url="/openapi.json" if settings.debug else None,
+    docs_url="/docs" if settings.debug else None,
+    redoc_url=None,
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS middleware (allows any origin - in production, specify exact origins)
+app.add_middleware(CORSMiddleware)
 
-# Include routers
-app.include_router(projects_router, prefix="/api")
-app.include_router(test_cases_router, prefix="/api")
-app.include_router(scenarios_router, prefix="/api")
-app.include_router(steps_router, prefix="/api")
-app.include_router(test_runs_router, prefix="/api")
-app.include_router(step_results_router, prefix="/api")
-app.include_router(services_router, prefix="/api")
-app.include_router(ai_router, prefix="/api")
-app.include_router(mobile_router, prefix="/api")
-app.include_router(integrations_router, prefix="/api")
-app.include_router(test_runner_router, prefix="/api")
+# Compose all routers under a single /api router and mount it once
+api_router = APIRouter(prefix="/api")
+for router in (
+    projects_router,
+    test_cases_router,
+    scenarios_router,
+    steps_router,
+    test_runs_router,
+    step_results_router,
+    services_router,
+    ai_router,
+    mobile_router,
+    integrations_router,
+    test_runner_router,
+):
+    api_router.include_router(router)
+app.include_router(api_router)
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": settings.app_name,
-        "version": settings.app_version,
-    }
+    return HEALTH_INFO
 
 
 @app.get("/api/app-info")
 async def get_app_info():
     """Get application info"""
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "platform": platform.system().lower(),
-        "arch": platform.machine(),
-    }
+    return APP_INFO
 
 
 @app.get("/api/platform")
 async def get_platform():
     """Get platform info"""
-    return platform.system().lower()
+    return PLATFORM
 
 
 @app.get("/api/db-path")
@@ -0,0 +1,66 @@
+"""
+Lightweight ASGI middleware
+"""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+PREFLIGHT_MAX_AGE = b"600"
+
+
+class CORSMiddleware:
+    """
+    Permissive CORS middleware written as a plain ASGI callable
+
+    Equivalent to Starlette's CORSMiddleware configured with wildcard
+    origins, methods and headers plus credentials, but answers preflight
+    requests and decorates responses without building Request/Response
+    objects.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_headers = None
+        is_preflight = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                is_preflight = True
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Credentials are allowed, so the origin must be echoed rather than "*"
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+        if is_preflight and scope["method"] == "OPTIONS":
+            cors_headers.append((b"access-control-allow-methods", ALLOW_METHODS))
+            cors_headers.append((b"access-control-max-age", PREFLIGHT_MAX_AGE))
+            if request_headers is not None:
+                cors_headers.append((b"access-control-allow-headers", request_headers))
+            cors_headers.append((b"content-length", b"2"))
+            cors_headers.append((b"content-type", b"text/plain; charset=utf-8"))
+            await send({"type": "http.response.start", "status": 200, "headers": cors_headers})
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + cors_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -14,9 +14,9 @@ from .scenario import (
     ScenarioCreate,
     ScenarioUpdate,
     ScenarioResponse,
-    ScenarioWithSteps,
 )
 from .step import Step, StepCreate, StepUpdate, StepResponse, StepConfig
+from .composed import ScenarioWithSteps
 from .test_run import (
     TestRun,
     TestRunCreate,
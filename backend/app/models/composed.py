@@ -0,0 +1,10 @@
+from typing import List
+
+from .scenario import ScenarioResponse
+from .step import StepResponse
+
+
+class ScenarioWithSteps(ScenarioResponse):
+    """Scenario with its steps"""
+
+    steps: List[StepResponse] = []
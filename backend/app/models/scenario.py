@@ -1,15 +1,14 @@
-import uuid
 from datetime import datetime
-from typing import Optional, List, TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from sqlalchemy import String, DateTime, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.database import Base
+from app.db.database import Base, ID_TYPE, generate_id, utcnow
 
 if TYPE_CHECKING:
-    from .step import StepResponse
+    from .step import Step
 
 
 class Scenario(Base):
@@ -17,13 +16,18 @@ class Scenario(Base):
 
     __tablename__ = "scenarios"
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    test_case_id: Mapped[str] = mapped_column(String, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[str] = mapped_column(ID_TYPE, primary_key=True, default=generate_id)
+    test_case_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     target_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
+
+    # Loaded explicitly (selectinload) where needed; lazy loads would block under asyncio
+    steps: Mapped[List["Step"]] = relationship(
+        order_by="Step.step_order", lazy="raise", passive_deletes=True
+    )
 
 
 class ScenarioCreate(BaseModel):
@@ -54,17 +58,5 @@ class ScenarioResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
-
-
-class ScenarioWithSteps(ScenarioResponse):
-    """Scenario with its steps"""
-
-    steps: List["StepResponse"] = []
-
-
-# Update forward reference
-from .step import StepResponse
+    model_config = ConfigDict(from_attributes=True)
 
-ScenarioWithSteps.model_rebuild()
@@ -1,28 +1,27 @@
-import uuid
-import json
 from datetime import datetime
 from typing import Optional, Dict, Any
 
-from pydantic import BaseModel, field_validator
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Text
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import JSON, String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.database import Base
+from app.db.database import Base, ID_TYPE, generate_id, utcnow
 
 
 class Step(Base):
     """Step database model"""
 
     __tablename__ = "steps"
+    __table_args__ = (Index("ix_steps_scenario_order", "scenario_id", "step_order"),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    scenario_id: Mapped[str] = mapped_column(String, ForeignKey("scenarios.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[str] = mapped_column(ID_TYPE, primary_key=True, default=generate_id)
+    scenario_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("scenarios.id", ondelete="CASCADE"), nullable=False)
     step_order: Mapped[int] = mapped_column(Integer, nullable=False)
     step_type: Mapped[str] = mapped_column(String, nullable=False)
     label: Mapped[str] = mapped_column(String, nullable=False)
-    config: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    config: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
 
 
 class StepConfig(BaseModel):
@@ -35,8 +34,7 @@ class StepConfig(BaseModel):
     expected: Optional[str] = None
     operator: Optional[str] = None
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 class StepCreate(BaseModel):
@@ -66,16 +64,9 @@ class StepResponse(BaseModel):
     step_order: int
     step_type: str
     label: str
-    config: StepConfig
+    # Stored config is passed through as-is rather than rebuilt as a StepConfig
+    config: Dict[str, Any]
     created_at: datetime
     updated_at: datetime
 
-    @field_validator("config", mode="before")
-    @classmethod
-    def parse_config(cls, v):
-        if isinstance(v, str):
-            return json.loads(v)
-        return v
-
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,28 +1,28 @@
-import uuid
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
-from sqlalchemy import String, DateTime, Integer, ForeignKey
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.database import Base
+from app.db.database import Base, ID_TYPE, generate_id, utcnow
 
 
 class StepResult(Base):
     """Step result database model"""
 
     __tablename__ = "step_results"
+    __table_args__ = (Index("ix_step_results_run_tc", "test_run_id", "test_case_id"),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    test_run_id: Mapped[str] = mapped_column(String, ForeignKey("test_runs.id", ondelete="CASCADE"), nullable=False)
-    step_id: Mapped[str] = mapped_column(String, ForeignKey("steps.id", ondelete="CASCADE"), nullable=False)
-    test_case_id: Mapped[str] = mapped_column(String, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[str] = mapped_column(ID_TYPE, primary_key=True, default=generate_id)
+    test_run_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("test_runs.id", ondelete="CASCADE"), nullable=False)
+    step_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("steps.id", ondelete="CASCADE"), nullable=False, index=True)
+    test_case_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("test_cases.id", ondelete="CASCADE"), nullable=False, index=True)
     status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
     duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     screenshot_path: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
 
 class StepResultCreate(BaseModel):
@@ -50,5 +50,4 @@ class StepResultResponse(BaseModel):
     screenshot_path: Optional[str]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
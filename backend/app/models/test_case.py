@@ -1,29 +1,36 @@
-import uuid
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
-from sqlalchemy import String, DateTime, ForeignKey
+from pydantic import BaseModel, ConfigDict
+from pydantic.dataclasses import dataclass
+from sqlalchemy import String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.database import Base
+from app.db.database import Base, ID_TYPE, generate_id, utcnow
 
 
 class TestCase(Base):
     """Test case database model"""
 
     __tablename__ = "test_cases"
-
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    project_id: Mapped[str] = mapped_column(String, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    __table_args__ = (
+        Index("ix_test_cases_project_status", "project_id", "status"),
+        Index("ix_test_cases_project_category", "project_id", "category"),
+        Index("ix_test_cases_project_priority", "project_id", "priority"),
+        # Also serves ORDER BY updated_at DESC (scanned backwards)
+        Index("ix_test_cases_project_updated", "project_id", "updated_at"),
+    )
+
+    id: Mapped[str] = mapped_column(ID_TYPE, primary_key=True, default=generate_id)
+    project_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     category: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     priority: Mapped[str] = mapped_column(String, nullable=False, default="Medium")
     test_type: Mapped[str] = mapped_column(String, nullable=False, default="Automated")
     status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, onupdate=utcnow)
 
 
 class TestCaseCreate(BaseModel):
@@ -72,16 +79,17 @@ class TestCaseResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class CategoryCount(BaseModel):
+@dataclass(slots=True)
+class CategoryCount:
     category: str
     count: int
 
 
-class PriorityCount(BaseModel):
+@dataclass(slots=True)
+class PriorityCount:
     priority: str
     count: int
 
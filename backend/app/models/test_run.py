@@ -1,21 +1,21 @@
-import uuid
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
-from sqlalchemy import String, DateTime, Integer, ForeignKey
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.database import Base
+from app.db.database import Base, ID_TYPE, generate_id, utcnow
 
 
 class TestRun(Base):
     """Test run database model"""
 
     __tablename__ = "test_runs"
+    __table_args__ = (Index("ix_test_runs_project_status", "project_id", "status"),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    project_id: Mapped[str] = mapped_column(String, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    id: Mapped[str] = mapped_column(ID_TYPE, primary_key=True, default=generate_id)
+    project_id: Mapped[str] = mapped_column(ID_TYPE, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
     duration_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
@@ -24,7 +24,7 @@ class TestRun(Base):
     skipped: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
 
 
 class TestRunCreate(BaseModel):
@@ -61,8 +61,7 @@ class TestRunResponse(BaseModel):
     completed_at: Optional[datetime]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class TestRunSummary(BaseModel):
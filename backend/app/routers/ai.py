@@ -1,13 +1,70 @@
-from typing import Optional, List, Any
+import asyncio
+import hashlib
+from typing import Dict, Optional, List, Any
 
 import httpx
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from pydantic.dataclasses import dataclass
+from starlette.background import BackgroundTask
 
 from app.config import settings
+from app.services.http_client import coalesce, get_http_client
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Upstream AI agent endpoints (settings are frozen, so these never change)
+AI_AGENT_URL = settings.ai_agent_url
+HEALTH_URL = f"{AI_AGENT_URL}/health"
+ANALYZE_CODE_URL = f"{AI_AGENT_URL}/analyze-code"
+GENERATE_TESTS_URL = f"{AI_AGENT_URL}/generate-tests"
+PARSE_REQUIREMENTS_URL = f"{AI_AGENT_URL}/parse-requirements"
+WEB_ANALYZE_URL = f"{AI_AGENT_URL}/web/analyze"
+WEB_FIND_ELEMENT_URL = f"{AI_AGENT_URL}/web/find-element"
+WEB_SUGGEST_STEP_URL = f"{AI_AGENT_URL}/web/suggest-step"
+
+# Analyses of byte-identical submissions (retries, re-analyzing an unchanged file)
+# are served from memory; the oldest entry is evicted once the cache is full
+ANALYSIS_CACHE_SIZE = 256
+_analysis_cache: Dict[bytes, bytes] = {}
+
+# Most snippets one batch request may submit, and most it keeps in flight at once
+ANALYZE_BATCH_MAX_ITEMS = 50
+ANALYZE_BATCH_CONCURRENCY = 8
+
+
+def json_request_body(model: type[BaseModel]) -> dict:
+    """OpenAPI request body for endpoints that forward the raw JSON body as-is"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
+
+
+def validated_body(model: type[BaseModel]):
+    """Dependency returning the raw request body once it validates against model
+
+    The bytes are forwarded as received, so multi-MB base64 screenshots are
+    parsed once for validation but never re-serialized.
+    """
+    async def dependency(request: Request) -> bytes:
+        body = await request.body()
+        try:
+            model.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+        return body
+
+    return dependency
+
 
 # ============================================
 # Request/Response Models
@@ -20,7 +77,8 @@ class AnalyzeCodeRequest(BaseModel):
     context: Optional[str] = None
 
 
-class FunctionInfo(BaseModel):
+@dataclass(slots=True)
+class FunctionInfo:
     name: str
     parameters: List[str]
     return_type: Optional[str]
@@ -47,7 +105,8 @@ class GenerateTestsRequest(BaseModel):
     requirements: Optional[List[str]] = None
 
 
-class GeneratedTest(BaseModel):
+@dataclass(slots=True)
+class GeneratedTest:
     name: str
     description: str
     code: str
@@ -64,13 +123,15 @@ class ParseRequirementsRequest(BaseModel):
     format: Optional[str] = None
 
 
-class TestStep(BaseModel):
+@dataclass(slots=True)
+class TestStep:
     order: int
     action: str
     expected: Optional[str]
 
 
-class ParsedTestCase(BaseModel):
+@dataclass(slots=True)
+class ParsedTestCase:
     title: str
     description: str
     preconditions: List[str]
@@ -83,7 +144,8 @@ class ParseRequirementsResponse(BaseModel):
     test_cases: List[ParsedTestCase]
 
 
-class AiWebStepConfig(BaseModel):
+@dataclass(slots=True)
+class AiWebStepConfig:
     selector: Optional[str] = None
     xpath: Optional[str] = None
     url: Optional[str] = None
@@ -94,14 +156,16 @@ class AiWebStepConfig(BaseModel):
     expected_value: Optional[str] = None
 
 
-class AiWebSuggestedStep(BaseModel):
+@dataclass(slots=True)
+class AiWebSuggestedStep:
     step_type: str
     label: str
     config: AiWebStepConfig
     confidence: float
 
 
-class DetectedWebElement(BaseModel):
+@dataclass(slots=True)
+class DetectedWebElement:
     element_type: str
     description: str
     selector: str
@@ -154,58 +218,117 @@ class SuggestWebStepRequest(BaseModel):
 # ============================================
 
 
+async def fetch_analysis(body: bytes, client: httpx.AsyncClient) -> bytes:
+    """Analysis JSON for a serialized AnalyzeCodeRequest, cached by its SHA-256"""
+    key = hashlib.sha256(body).digest()
+    cached = _analysis_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> bytes:
+        response = await client.post(
+            ANALYZE_CODE_URL,
+            content=body,
+            headers=JSON_HEADERS,
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return response.content
+
+    # Concurrent identical submissions share one upstream call
+    content = await coalesce(("analyze-code", key), fetch)
+    if key not in _analysis_cache:
+        if len(_analysis_cache) >= ANALYSIS_CACHE_SIZE:
+            del _analysis_cache[next(iter(_analysis_cache))]
+        _analysis_cache[key] = content
+    return content
+
+
+async def stream_upstream(
+    url: str, body: bytes, timeout: float, client: httpx.AsyncClient
+) -> StreamingResponse:
+    """POST to the AI agent and relay its response body to the caller as it arrives"""
+    upstream = await client.send(
+        client.build_request("POST", url, content=body, headers=JSON_HEADERS, timeout=timeout),
+        stream=True,
+    )
+    if upstream.is_error:
+        await upstream.aclose()
+        upstream.raise_for_status()
+
+    # The upstream response is closed once the body has been relayed
+    return StreamingResponse(
+        upstream.aiter_bytes(),
+        media_type="application/json",
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
 @router.get("/available")
-async def check_ai_available():
+async def check_ai_available(client: httpx.AsyncClient = Depends(get_http_client)):
     """Check if AI agent service is available"""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.ai_agent_url}/health")
-            return {"available": response.status_code == 200}
+        response = await client.get(HEALTH_URL, timeout=5.0)
+        return {"available": response.status_code == 200}
     except Exception:
         return {"available": False}
 
 
-@router.post("/analyze-code", response_model=AnalyzeCodeResponse)
-async def analyze_code(request: AnalyzeCodeRequest):
+@router.post("/analyze-code", responses={200: {"model": AnalyzeCodeResponse}})
+async def analyze_code(
+    request: AnalyzeCodeRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Analyze code using AI"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{settings.ai_agent_url}/analyze-code",
-                json=request.model_dump(),
-            )
-            response.raise_for_status()
-            return response.json()
+        # Encoded once: the same bytes are hashed for the cache and sent upstream
+        content = await fetch_analysis(request.model_dump_json().encode(), client)
+        return Response(content=content, media_type="application/json")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
+
+
+@router.post("/analyze-code/batch", responses={200: {"model": List[AnalyzeCodeResponse]}})
+async def analyze_code_batch(
+    requests: List[AnalyzeCodeRequest] = Body(max_length=ANALYZE_BATCH_MAX_ITEMS),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """Analyze several code snippets concurrently, returning results in request order"""
+    semaphore = asyncio.Semaphore(ANALYZE_BATCH_CONCURRENCY)
+
+    async def analyze_one(request: AnalyzeCodeRequest) -> bytes:
+        async with semaphore:
+            return await fetch_analysis(request.model_dump_json().encode(), client)
+
+    try:
+        results = await asyncio.gather(*(analyze_one(request) for request in requests))
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
+    # Upstream bodies are already JSON, so splice them into an array without re-parsing
+    return Response(content=b"[" + b",".join(results) + b"]", media_type="application/json")
 
 
-@router.post("/generate-tests", response_model=GenerateTestsResponse)
-async def generate_tests(request: GenerateTestsRequest):
+@router.post("/generate-tests", responses={200: {"model": GenerateTestsResponse}})
+async def generate_tests(
+    request: GenerateTestsRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Generate tests using AI"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{settings.ai_agent_url}/generate-tests",
-                json=request.model_dump(),
-            )
-            response.raise_for_status()
-            return response.json()
+        return await stream_upstream(
+            GENERATE_TESTS_URL, request.model_dump_json().encode(), 60.0, client
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
 
 
-@router.post("/parse-requirements", response_model=ParseRequirementsResponse)
-async def parse_requirements(request: ParseRequirementsRequest):
+@router.post("/parse-requirements", responses={200: {"model": ParseRequirementsResponse}})
+async def parse_requirements(
+    request: ParseRequirementsRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Parse requirements into test cases using AI"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{settings.ai_agent_url}/parse-requirements",
-                json=request.model_dump(),
-            )
-            response.raise_for_status()
-            return response.json()
+        return await stream_upstream(
+            PARSE_REQUIREMENTS_URL, request.model_dump_json().encode(), 60.0, client
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
 
@@ -215,46 +338,82 @@ async def parse_requirements(request: ParseRequirementsRequest):
 # ============================================
 
 
-@router.post("/web/analyze", response_model=AiWebAnalysisResult)
-async def analyze_web_page(request: AnalyzeWebPageRequest):
+@router.post(
+    "/web/analyze",
+    responses={200: {"model": AiWebAnalysisResult}},
+    openapi_extra=json_request_body(AnalyzeWebPageRequest),
+)
+async def analyze_web_page(
+    body: bytes = Depends(validated_body(AnalyzeWebPageRequest)),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Analyze a web page screenshot using AI"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{settings.ai_agent_url}/web/analyze",
-                json=request.model_dump(),
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await client.post(
+            WEB_ANALYZE_URL,
+            content=body,
+            headers=JSON_HEADERS,
+            timeout=60.0,
+        )
+        response.raise_for_status()
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type="application/json",
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
 
 
-@router.post("/web/find-element", response_model=AiWebElementLocation)
-async def find_web_element(request: FindWebElementRequest):
+@router.post(
+    "/web/find-element",
+    responses={200: {"model": AiWebElementLocation}},
+    openapi_extra=json_request_body(FindWebElementRequest),
+)
+async def find_web_element(
+    body: bytes = Depends(validated_body(FindWebElementRequest)),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Find a web element using AI"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{settings.ai_agent_url}/web/find-element",
-                json=request.model_dump(),
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await client.post(
+            WEB_FIND_ELEMENT_URL,
+            content=body,
+            headers=JSON_HEADERS,
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type="application/json",
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
 
 
-@router.post("/web/suggest-step", response_model=AiWebSuggestedStep)
-async def suggest_web_step(request: SuggestWebStepRequest):
+@router.post(
+    "/web/suggest-step",
+    responses={200: {"model": AiWebSuggestedStep}},
+    openapi_extra=json_request_body(SuggestWebStepRequest),
+)
+async def suggest_web_step(
+    body: bytes = Depends(validated_body(SuggestWebStepRequest)),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Get AI-suggested next step for web testing"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{settings.ai_agent_url}/web/suggest-step",
-                json=request.model_dump(),
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await client.post(
+            WEB_SUGGEST_STEP_URL,
+            content=body,
+            headers=JSON_HEADERS,
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type="application/json",
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"AI service error: {str(e)}")
@@ -1,11 +1,40 @@
-from typing import List, Optional
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional
 
 import httpx
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
+from app.services.http_client import coalesce, get_http_client
+
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
+API_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# Only the Jira fields JiraIssue is built from
+JIRA_ISSUE_FIELDS = "summary,description,status,issuetype,priority,assignee,labels"
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Single-paragraph Atlassian Document Format body, pre-serialized around the text
+JIRA_ADF_PREFIX = b'{"type":"doc","version":1,"content":[{"type":"paragraph","content":[{"type":"text","text":'
+JIRA_ADF_SUFFIX = b"}]}]}"
+# ADF block nodes that end a line when a document is flattened to text
+JIRA_ADF_BLOCKS = {"paragraph", "heading", "codeBlock"}
+
+# Most issues requested per search page; Jira may apply a lower cap of its own
+JIRA_PAGE_SIZE = 100
+JIRA_SEARCH_CONCURRENCY = 8
+
+# Short-lived cache of GitHub GET responses:
+# (token, owner, repo, path, params) -> (fetched_at, etag, parsed value)
+GITHUB_CACHE_TTL = 60.0
+GITHUB_CACHE_MAXSIZE = 4096
+_github_cache: "OrderedDict[tuple, tuple[float, Optional[str], Any]]" = OrderedDict()
+
 
 # ============================================
 # Jira Models
@@ -92,102 +121,185 @@ class CreateGitHubIssueRequest(BaseModel):
 # ============================================
 
 
+def _jira_create_body(fields: dict, description: str) -> bytes:
+    """Serialize an issue-create body, splicing the ADF description into fields"""
+    # fields is never empty, so its closing brace can be swapped for one more key
+    return (
+        b'{"fields":' + orjson.dumps(fields)[:-1]
+        + b',"description":' + JIRA_ADF_PREFIX + orjson.dumps(description) + JIRA_ADF_SUFFIX
+        + b"}}"
+    )
+
+
+def _adf_to_text(document: Any) -> Optional[str]:
+    """Flatten an Atlassian Document Format value to plain text
+
+    API v3 returns descriptions as ADF documents; plain strings and None are
+    returned unchanged.
+    """
+    if document is None or isinstance(document, str):
+        return document
+    parts: List[str] = []
+
+    def walk(node: dict) -> None:
+        node_type = node.get("type")
+        if node_type == "text":
+            parts.append(node.get("text", ""))
+        elif node_type == "hardBreak":
+            parts.append("\n")
+        for child in node.get("content") or ():
+            walk(child)
+        if node_type in JIRA_ADF_BLOCKS:
+            parts.append("\n")
+
+    walk(document)
+    return "".join(parts).rstrip("\n")
+
+
+def _parse_jira_issue(item: dict) -> JiraIssue:
+    """Build a JiraIssue from a Jira REST API issue object"""
+    fields = item["fields"]
+    priority = fields.get("priority")
+    assignee = fields.get("assignee")
+    return JiraIssue(
+        id=item["id"],
+        key=item["key"],
+        summary=fields["summary"],
+        description=_adf_to_text(fields.get("description")),
+        status=fields["status"]["name"],
+        issue_type=fields["issuetype"]["name"],
+        priority=priority["name"] if priority else None,
+        assignee=assignee["displayName"] if assignee else None,
+        labels=fields.get("labels") or [],
+    )
+
+
+async def _fetch_jira_issue(
+    client: httpx.AsyncClient, credentials: JiraCredentials, issue_key: str
+) -> JiraIssue:
+    """Fetch a single Jira issue, requesting only the fields we parse"""
+    response = await client.get(
+        f"{credentials.base_url}/rest/api/3/issue/{issue_key}",
+        auth=(credentials.email, credentials.api_token),
+        params={"fields": JIRA_ISSUE_FIELDS},
+        timeout=API_TIMEOUT,
+    )
+    response.raise_for_status()
+    return _parse_jira_issue(orjson.loads(response.content))
+
+
 @router.post("/jira/issue/{issue_key}", response_model=JiraIssue)
-async def get_jira_issue(issue_key: str, credentials: JiraCredentials):
+async def get_jira_issue(
+    issue_key: str,
+    credentials: JiraCredentials,
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Get a Jira issue by key"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{credentials.base_url}/rest/api/3/issue/{issue_key}",
-                auth=(credentials.email, credentials.api_token),
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return JiraIssue(
-                id=data["id"],
-                key=data["key"],
-                summary=data["fields"]["summary"],
-                description=data["fields"].get("description"),
-                status=data["fields"]["status"]["name"],
-                issue_type=data["fields"]["issuetype"]["name"],
-                priority=data["fields"].get("priority", {}).get("name"),
-                assignee=data["fields"].get("assignee", {}).get("displayName") if data["fields"].get("assignee") else None,
-                labels=data["fields"].get("labels", []),
-            )
+        return await coalesce(
+            ("jira", credentials.base_url, credentials.email, credentials.api_token, issue_key),
+            lambda: _fetch_jira_issue(client, credentials, issue_key),
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Jira API error: {str(e)}")
 
 
 @router.post("/jira/issue", response_model=JiraIssue)
-async def create_jira_issue(request: CreateJiraIssueRequest):
+async def create_jira_issue(
+    request: CreateJiraIssueRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Create a Jira issue"""
     try:
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "fields": {
-                    "project": {"key": request.credentials.project_key},
-                    "summary": request.summary,
-                    "description": {
-                        "type": "doc",
-                        "version": 1,
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": request.description}],
-                            }
-                        ],
-                    },
-                    "issuetype": {"name": request.issue_type},
-                }
-            }
-            if request.labels:
-                payload["fields"]["labels"] = request.labels
-
-            response = await client.post(
-                f"{request.credentials.base_url}/rest/api/3/issue",
-                auth=(request.credentials.email, request.credentials.api_token),
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Fetch the created issue
-            return await get_jira_issue(data["key"], request.credentials)
+        fields = {
+            "project": {"key": request.credentials.project_key},
+            "summary": request.summary,
+            "issuetype": {"name": request.issue_type},
+        }
+        if request.labels:
+            fields["labels"] = request.labels
+
+        response = await client.post(
+            f"{request.credentials.base_url}/rest/api/3/issue",
+            auth=(request.credentials.email, request.credentials.api_token),
+            content=_jira_create_body(fields, request.description),
+            headers=JSON_HEADERS,
+            timeout=API_TIMEOUT,
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        # The create response only carries id/key, so fetch the parsed fields
+        return await _fetch_jira_issue(client, request.credentials, data["key"])
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Jira API error: {str(e)}")
 
 
+async def _search_jira_page(
+    client: httpx.AsyncClient,
+    credentials: JiraCredentials,
+    jql: str,
+    start_at: int,
+    max_results: int,
+) -> dict:
+    """Fetch one page of Jira search results"""
+    response = await client.get(
+        f"{credentials.base_url}/rest/api/3/search",
+        auth=(credentials.email, credentials.api_token),
+        params={
+            "jql": jql,
+            "startAt": start_at,
+            "maxResults": max_results,
+            "fields": JIRA_ISSUE_FIELDS,
+        },
+        timeout=API_TIMEOUT,
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+
 @router.post("/jira/search")
-async def search_jira_issues(request: SearchJiraRequest):
-    """Search Jira issues using JQL"""
+async def search_jira_issues(
+    request: SearchJiraRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
+    """Search Jira issues using JQL
+
+    Jira caps each search page, so after the first page reports the total the
+    remaining pages up to max_results are fetched concurrently.
+    """
+    credentials = request.credentials
+    limit = request.max_results if request.max_results is not None else 50
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{request.credentials.base_url}/rest/api/3/search",
-                auth=(request.credentials.email, request.credentials.api_token),
-                params={"jql": request.jql, "maxResults": request.max_results},
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            issues = []
-            for item in data.get("issues", []):
-                issues.append(
-                    JiraIssue(
-                        id=item["id"],
-                        key=item["key"],
-                        summary=item["fields"]["summary"],
-                        description=item["fields"].get("description"),
-                        status=item["fields"]["status"]["name"],
-                        issue_type=item["fields"]["issuetype"]["name"],
-                        priority=item["fields"].get("priority", {}).get("name"),
-                        assignee=item["fields"].get("assignee", {}).get("displayName") if item["fields"].get("assignee") else None,
-                        labels=item["fields"].get("labels", []),
+        first = await _search_jira_page(
+            client, credentials, request.jql, 0, min(limit, JIRA_PAGE_SIZE)
+        )
+        total = first.get("total", 0)
+        pages = [first]
+
+        # Jira may apply a smaller page size than requested (often 50), so step by
+        # the size it reports rather than the size asked for
+        page_size = first.get("maxResults") or len(first.get("issues", []))
+        wanted = min(total, limit)
+        if 0 < page_size < wanted:
+            semaphore = asyncio.Semaphore(JIRA_SEARCH_CONCURRENCY)
+
+            async def fetch_page(start_at: int) -> dict:
+                async with semaphore:
+                    return await _search_jira_page(
+                        client,
+                        credentials,
+                        request.jql,
+                        start_at,
+                        min(page_size, wanted - start_at),
                     )
-                )
 
-            return {"issues": issues, "total": data.get("total", 0)}
+            starts = range(page_size, wanted, page_size)
+            pages.extend(await asyncio.gather(*(fetch_page(start) for start in starts)))
+
+        issues = [
+            _parse_jira_issue(item) for page in pages for item in page.get("issues", [])
+        ]
+
+        return {"issues": issues, "total": total}
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Jira API error: {str(e)}")
 
@@ -197,70 +309,152 @@ async def search_jira_issues(request: SearchJiraRequest):
 # ============================================
 
 
+def _parse_github_issue(item: dict) -> GitHubIssue:
+    """Build a GitHubIssue from a GitHub REST API issue object"""
+    assignee = item.get("assignee")
+    return GitHubIssue(
+        id=item["id"],
+        number=item["number"],
+        title=item["title"],
+        body=item.get("body"),
+        state=item["state"],
+        labels=[label["name"] for label in item.get("labels") or ()],
+        assignee=assignee["login"] if assignee else None,
+        html_url=item["html_url"],
+    )
+
+
+def _parse_github_pull_request(item: dict) -> GitHubPullRequest:
+    """Build a GitHubPullRequest from a GitHub REST API pull request object"""
+    return GitHubPullRequest(
+        id=item["id"],
+        number=item["number"],
+        title=item["title"],
+        body=item.get("body"),
+        state=item["state"],
+        head=item["head"]["ref"],
+        base=item["base"]["ref"],
+        html_url=item["html_url"],
+        merged=item.get("merged", False),
+    )
+
+
+def _github_headers(credentials: GitHubCredentials) -> dict:
+    """Request headers for the GitHub REST API"""
+    return {
+        "Authorization": f"token {credentials.token}",
+        "Accept": "application/vnd.github.v3+json",
+    }
+
+
+def _parse_github_issue_list(items: list) -> List[GitHubIssue]:
+    """Build GitHubIssues from an issue listing, excluding pull requests"""
+    return [_parse_github_issue(item) for item in items if "pull_request" not in item]
+
+
+async def _github_get(
+    client: httpx.AsyncClient,
+    credentials: GitHubCredentials,
+    path: str,
+    parse: Callable[[Any], Any],
+    params: Optional[dict] = None,
+) -> Any:
+    """GET a repo-scoped GitHub resource through a short-lived ETag cache
+
+    Fresh entries are served without a request; stale ones are revalidated
+    with If-None-Match, and a 304 does not count against the rate limit.
+    """
+    key = (
+        credentials.token,
+        credentials.owner,
+        credentials.repo,
+        path,
+        tuple(sorted(params.items())) if params else (),
+    )
+    cached = _github_cache.get(key)
+    now = time.monotonic()
+    if cached and now - cached[0] < GITHUB_CACHE_TTL:
+        _github_cache.move_to_end(key)
+        return cached[2]
+
+    async def fetch() -> Any:
+        headers = _github_headers(credentials)
+        if cached and cached[1]:
+            headers["If-None-Match"] = cached[1]
+
+        response = await client.get(
+            f"https://api.github.com/repos/{credentials.owner}/{credentials.repo}{path}",
+            headers=headers,
+            params=params,
+            timeout=API_TIMEOUT,
+        )
+        etag = response.headers.get("ETag")
+        if cached and response.status_code == 304:
+            value = cached[2]
+            etag = etag or cached[1]
+        else:
+            response.raise_for_status()
+            value = parse(orjson.loads(response.content))
+
+        _github_cache[key] = (now, etag, value)
+        _github_cache.move_to_end(key)
+        if len(_github_cache) > GITHUB_CACHE_MAXSIZE:
+            _github_cache.popitem(last=False)
+        return value
+
+    # Concurrent misses for the same resource share a single upstream request
+    return await coalesce(("github",) + key, fetch)
+
+
+def _invalidate_github_repo(credentials: GitHubCredentials) -> None:
+    """Drop cached GitHub responses for a repository"""
+    repo = (credentials.owner, credentials.repo)
+    for key in [key for key in _github_cache if key[1:3] == repo]:
+        del _github_cache[key]
+
+
 @router.post("/github/issue/{issue_number}", response_model=GitHubIssue)
-async def get_github_issue(issue_number: int, credentials: GitHubCredentials):
+async def get_github_issue(
+    issue_number: int,
+    credentials: GitHubCredentials,
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Get a GitHub issue by number"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.github.com/repos/{credentials.owner}/{credentials.repo}/issues/{issue_number}",
-                headers={
-                    "Authorization": f"token {credentials.token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return GitHubIssue(
-                id=data["id"],
-                number=data["number"],
-                title=data["title"],
-                body=data.get("body"),
-                state=data["state"],
-                labels=[label["name"] for label in data.get("labels", [])],
-                assignee=data.get("assignee", {}).get("login") if data.get("assignee") else None,
-                html_url=data["html_url"],
-            )
+        return await _github_get(
+            client, credentials, f"/issues/{issue_number}", _parse_github_issue
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"GitHub API error: {str(e)}")
 
 
 @router.post("/github/issue", response_model=GitHubIssue)
-async def create_github_issue(request: CreateGitHubIssueRequest):
+async def create_github_issue(
+    request: CreateGitHubIssueRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Create a GitHub issue"""
     try:
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "title": request.title,
-                "body": request.body,
-            }
-            if request.labels:
-                payload["labels"] = request.labels
-            if request.assignees:
-                payload["assignees"] = request.assignees
-
-            response = await client.post(
-                f"https://api.github.com/repos/{request.credentials.owner}/{request.credentials.repo}/issues",
-                headers={
-                    "Authorization": f"token {request.credentials.token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return GitHubIssue(
-                id=data["id"],
-                number=data["number"],
-                title=data["title"],
-                body=data.get("body"),
-                state=data["state"],
-                labels=[label["name"] for label in data.get("labels", [])],
-                assignee=data.get("assignee", {}).get("login") if data.get("assignee") else None,
-                html_url=data["html_url"],
-            )
+        payload = {
+            "title": request.title,
+            "body": request.body,
+        }
+        if request.labels:
+            payload["labels"] = request.labels
+        if request.assignees:
+            payload["assignees"] = request.assignees
+
+        response = await client.post(
+            f"https://api.github.com/repos/{request.credentials.owner}/{request.credentials.repo}/issues",
+            headers=_github_headers(request.credentials),
+            json=payload,
+            timeout=API_TIMEOUT,
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        # Cached issue listings for this repo are now out of date
+        _invalidate_github_repo(request.credentials)
+        return _parse_github_issue(data)
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"GitHub API error: {str(e)}")
 
@@ -270,68 +464,31 @@ async def list_github_issues(
     credentials: GitHubCredentials,
     state: Optional[str] = "open",
     labels: Optional[List[str]] = None,
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
     """List GitHub issues"""
     try:
-        async with httpx.AsyncClient() as client:
-            params = {"state": state}
-            if labels:
-                params["labels"] = ",".join(labels)
-
-            response = await client.get(
-                f"https://api.github.com/repos/{credentials.owner}/{credentials.repo}/issues",
-                headers={
-                    "Authorization": f"token {credentials.token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-                params=params,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return [
-                GitHubIssue(
-                    id=item["id"],
-                    number=item["number"],
-                    title=item["title"],
-                    body=item.get("body"),
-                    state=item["state"],
-                    labels=[label["name"] for label in item.get("labels", [])],
-                    assignee=item.get("assignee", {}).get("login") if item.get("assignee") else None,
-                    html_url=item["html_url"],
-                )
-                for item in data
-                if "pull_request" not in item  # Exclude PRs
-            ]
+        params = {"state": state}
+        if labels:
+            params["labels"] = ",".join(labels)
+
+        return await _github_get(
+            client, credentials, "/issues", _parse_github_issue_list, params
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"GitHub API error: {str(e)}")
 
 
 @router.post("/github/pr/{pr_number}", response_model=GitHubPullRequest)
-async def get_github_pull_request(pr_number: int, credentials: GitHubCredentials):
+async def get_github_pull_request(
+    pr_number: int,
+    credentials: GitHubCredentials,
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Get a GitHub pull request by number"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.github.com/repos/{credentials.owner}/{credentials.repo}/pulls/{pr_number}",
-                headers={
-                    "Authorization": f"token {credentials.token}",
-                    "Accept": "application/vnd.github.v3+json",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return GitHubPullRequest(
-                id=data["id"],
-                number=data["number"],
-                title=data["title"],
-                body=data.get("body"),
-                state=data["state"],
-                head=data["head"]["ref"],
-                base=data["base"]["ref"],
-                html_url=data["html_url"],
-                merged=data.get("merged", False),
-            )
+        return await _github_get(
+            client, credentials, f"/pulls/{pr_number}", _parse_github_pull_request
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"GitHub API error: {str(e)}")
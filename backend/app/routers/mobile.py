@@ -1,16 +1,59 @@
 import subprocess
 import asyncio
-import base64
+import re
+import shlex
+import shutil
 import tempfile
-import os
-from typing import List, Optional
 from pathlib import Path
+from typing import List, Optional
 
+try:
+    # SIMD-accelerated, drop-in for the stdlib module on multi-MB screenshots
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    # pyobjc on macOS: post Simulator clicks in-process instead of spawning a helper
+    from Quartz import (
+        CGEventCreateMouseEvent,
+        CGEventPost,
+        kCGEventLeftMouseDown,
+        kCGEventLeftMouseUp,
+        kCGHIDEventTap,
+        kCGMouseButtonLeft,
+    )
+except ImportError:
+    CGEventPost = None
+
+import orjson
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/mobile", tags=["mobile"])
 
+MODEL_RE = re.compile(r"\bmodel:(\S+)")
+OFFLOAD_DECODE_BYTES = 64 * 1024
+
+# Tool paths resolved once; the bare names are kept so a missing tool still raises FileNotFoundError
+ADB = shutil.which("adb") or "adb"
+XCRUN = shutil.which("xcrun") or "xcrun"
+
+# cliclick posts mouse events directly, avoiding an AppleScript interpreter per tap
+CLICLICK = shutil.which("cliclick")
+IOS_TAP_SCRIPT = """
+on run argv
+    tell application "System Events" to click at {item 1 of argv as integer, item 2 of argv as integer}
+end run
+"""
+# Compiled copy of IOS_TAP_SCRIPT so osascript skips parsing it on every tap
+IOS_TAP_SCRIPT_COMPILED = Path(tempfile.gettempdir()) / "autotest_ios_tap.scpt"
+_ios_tap_script_compiled: Optional[bool] = None  # None until compilation is attempted
+
+# Simulator only needs bringing to the front once, not before every tap
+SIMULATOR_ACTIVATE_CMD = ["osascript", "-e", 'tell application "Simulator" to activate']
+_simulator_activated = False
+
 
 # ============================================
 # Models
@@ -53,14 +96,29 @@ class AppRequest(BaseModel):
     package: str  # package name for Android, bundle ID for iOS
 
 
+class InputAction(BaseModel):
+    type: str  # 'tap' | 'swipe' | 'text' | 'keyevent'
+    x: Optional[int] = None
+    y: Optional[int] = None
+    end_x: Optional[int] = None
+    end_y: Optional[int] = None
+    duration_ms: int = 300
+    text: Optional[str] = None
+    keycode: Optional[int] = None
+
+
+class InputScriptRequest(BaseModel):
+    actions: List[InputAction]
+
+
 # ============================================
 # Android (ADB) Commands
 # ============================================
 
 
-async def run_adb_command(args: List[str], device_id: Optional[str] = None) -> str:
-    """Run an ADB command"""
-    cmd = ["adb"]
+async def run_adb_binary(args: List[str], device_id: Optional[str] = None) -> bytes:
+    """Run an ADB command and return its raw stdout"""
+    cmd = [ADB]
     if device_id:
         cmd.extend(["-s", device_id])
     cmd.extend(args)
@@ -77,38 +135,35 @@ async def run_adb_command(args: List[str], device_id: Optional[str] = None) -> s
             raise HTTPException(
                 status_code=500, detail=f"ADB error: {stderr.decode()}"
             )
-        return stdout.decode()
+        return stdout
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail="ADB not found in PATH")
 
 
+async def run_adb_command(args: List[str], device_id: Optional[str] = None) -> str:
+    """Run an ADB command"""
+    return (await run_adb_binary(args, device_id)).decode()
+
+
 @router.get("/android/devices", response_model=List[DeviceInfo])
 async def list_android_devices():
     """List connected Android devices"""
     output = await run_adb_command(["devices", "-l"])
     devices = []
 
-    for line in output.strip().split("\n")[1:]:  # Skip header
-        if not line.strip():
+    for line in output.splitlines()[1:]:  # Skip header
+        parts = line.split(None, 2)
+        if len(parts) < 2:
             continue
-        parts = line.split()
-        if len(parts) >= 2:
-            device_id = parts[0]
-            status = parts[1]
-            name = ""
-            for part in parts[2:]:
-                if part.startswith("model:"):
-                    name = part.split(":")[1]
-                    break
-
-            devices.append(
-                DeviceInfo(
-                    id=device_id,
-                    name=name or device_id,
-                    status=status,
-                    platform="android",
-                )
+        model = MODEL_RE.search(line)
+        devices.append(
+            DeviceInfo.model_construct(
+                id=parts[0],
+                name=model.group(1) if model else parts[0],
+                status=parts[1],
+                platform="android",
             )
+        )
 
     return devices
 
@@ -116,24 +171,9 @@ async def list_android_devices():
 @router.get("/android/{device_id}/screenshot", response_model=ScreenshotResponse)
 async def android_screenshot(device_id: str):
     """Take a screenshot from an Android device"""
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-        temp_path = f.name
-
-    try:
-        # Take screenshot on device
-        await run_adb_command(["shell", "screencap", "-p", "/sdcard/screenshot.png"], device_id)
-        # Pull to local
-        await run_adb_command(["pull", "/sdcard/screenshot.png", temp_path], device_id)
-        # Clean up device
-        await run_adb_command(["shell", "rm", "/sdcard/screenshot.png"], device_id)
-
-        with open(temp_path, "rb") as f:
-            screenshot_data = base64.b64encode(f.read()).decode()
-
-        return ScreenshotResponse(screenshot=screenshot_data)
-    finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+    # exec-out streams the PNG straight to stdout, no file on device or host
+    png = await run_adb_binary(["exec-out", "screencap", "-p"], device_id)
+    return ScreenshotResponse(screenshot=base64.b64encode(png).decode("ascii"))
 
 
 @router.post("/android/{device_id}/tap")
@@ -182,6 +222,38 @@ async def android_keyevent(device_id: str, request: KeyEventRequest):
     return {"status": "ok"}
 
 
+def compile_android_action(action: InputAction) -> str:
+    """Compile one input action to an `input ...` shell command"""
+    try:
+        if action.type == "tap":
+            return f"input tap {int(action.x)} {int(action.y)}"
+        if action.type == "swipe":
+            return (
+                f"input swipe {int(action.x)} {int(action.y)} "
+                f"{int(action.end_x)} {int(action.end_y)} {int(action.duration_ms)}"
+            )
+        if action.type == "text":
+            # `input text` reads %s as a space; everything else is shell-quoted
+            return f"input text {shlex.quote(action.text.replace(' ', '%s'))}"
+        if action.type == "keyevent":
+            return f"input keyevent {int(action.keycode)}"
+    except (TypeError, AttributeError):
+        raise HTTPException(
+            status_code=400, detail=f"Missing fields for '{action.type}' action"
+        )
+    raise HTTPException(status_code=400, detail=f"Unknown action type: {action.type}")
+
+
+@router.post("/android/{device_id}/script")
+async def android_run_script(device_id: str, request: InputScriptRequest):
+    """Run several input actions in a single adb shell session"""
+    if not request.actions:
+        return {"status": "ok"}
+    script = " && ".join(compile_android_action(action) for action in request.actions)
+    await run_adb_command(["shell", script], device_id)
+    return {"status": "ok"}
+
+
 @router.post("/android/{device_id}/launch")
 async def android_launch_app(device_id: str, request: AppRequest):
     """Launch an app"""
@@ -209,15 +281,17 @@ async def android_clear_app(device_id: str, request: AppRequest):
 @router.get("/android/{device_id}/ui-dump")
 async def android_dump_ui(device_id: str):
     """Dump UI hierarchy"""
-    # Dump UI on device
-    await run_adb_command(
-        ["shell", "uiautomator", "dump", "/sdcard/ui.xml"], device_id
+    # Dump straight to stdout; uiautomator appends a status line after the XML
+    output = await run_adb_binary(
+        ["exec-out", "uiautomator", "dump", "/dev/tty"], device_id
     )
-    # Get content
-    output = await run_adb_command(["shell", "cat", "/sdcard/ui.xml"], device_id)
-    # Clean up
-    await run_adb_command(["shell", "rm", "/sdcard/ui.xml"], device_id)
-    return {"xml": output}
+    xml_end = output.rfind(b">")
+    if xml_end != -1:
+        output = output[: xml_end + 1]
+    # Dumps of busy screens run to hundreds of KB; decode those off the event loop
+    if len(output) > OFFLOAD_DECODE_BYTES:
+        return {"xml": await asyncio.to_thread(output.decode)}
+    return {"xml": output.decode()}
 
 
 # ============================================
@@ -225,9 +299,52 @@ async def android_dump_ui(device_id: str):
 # ============================================
 
 
-async def run_xcrun_command(args: List[str]) -> str:
-    """Run an xcrun simctl command"""
-    cmd = ["xcrun", "simctl"] + args
+def post_click(x: int, y: int) -> None:
+    """Post a left click at screen coordinates through Quartz"""
+    for event_type in (kCGEventLeftMouseDown, kCGEventLeftMouseUp):
+        event = CGEventCreateMouseEvent(None, event_type, (x, y), kCGMouseButtonLeft)
+        CGEventPost(kCGHIDEventTap, event)
+
+
+async def ensure_simulator_active() -> None:
+    """Activate the Simulator app ahead of the first tap since boot"""
+    global _simulator_activated
+    if _simulator_activated:
+        return
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *SIMULATOR_ACTIVATE_CMD,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        return
+    await process.wait()
+    _simulator_activated = process.returncode == 0
+
+
+async def ios_tap_script_args() -> List[str]:
+    """osascript arguments for the tap script, compiling it with osacompile on first use"""
+    global _ios_tap_script_compiled
+    if _ios_tap_script_compiled is None:
+        _ios_tap_script_compiled = False
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "osacompile", "-o", str(IOS_TAP_SCRIPT_COMPILED), "-e", IOS_TAP_SCRIPT,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            _ios_tap_script_compiled = await process.wait() == 0
+        except FileNotFoundError:
+            pass
+    if _ios_tap_script_compiled:
+        return [str(IOS_TAP_SCRIPT_COMPILED)]
+    return ["-e", IOS_TAP_SCRIPT]
+
+
+async def run_xcrun_binary(args: List[str]) -> bytes:
+    """Run an xcrun simctl command and return its raw stdout"""
+    cmd = [XCRUN, "simctl"] + args
 
     try:
         process = await asyncio.create_subprocess_exec(
@@ -241,38 +358,42 @@ async def run_xcrun_command(args: List[str]) -> str:
             raise HTTPException(
                 status_code=500, detail=f"xcrun error: {stderr.decode()}"
             )
-        return stdout.decode()
+        return stdout
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail="xcrun not found (requires Xcode)")
 
 
+async def run_xcrun_command(args: List[str]) -> str:
+    """Run an xcrun simctl command"""
+    return (await run_xcrun_binary(args)).decode()
+
+
 @router.get("/ios/devices", response_model=List[DeviceInfo])
 async def list_ios_devices():
     """List iOS simulators"""
-    import json
-
-    output = await run_xcrun_command(["list", "devices", "-j"])
-    data = json.loads(output)
-
-    devices = []
-    for runtime, device_list in data.get("devices", {}).items():
-        for device in device_list:
-            devices.append(
-                DeviceInfo(
-                    id=device["udid"],
-                    name=device["name"],
-                    status=device["state"].lower(),
-                    platform="ios",
-                )
-            )
-
-    return devices
+    output = await run_xcrun_binary(["list", "devices", "-j"])
+    data = orjson.loads(output)
+
+    # simctl output is trusted, so skip per-device validation
+    return [
+        DeviceInfo.model_construct(
+            id=device["udid"],
+            name=device["name"],
+            status=device["state"].lower(),
+            platform="ios",
+        )
+        for device_list in data.get("devices", {}).values()
+        for device in device_list
+    ]
 
 
 @router.post("/ios/{device_id}/boot")
 async def ios_boot_simulator(device_id: str):
     """Boot an iOS simulator"""
+    global _simulator_activated
     await run_xcrun_command(["boot", device_id])
+    # A freshly booted device may have reopened or moved the Simulator window
+    _simulator_activated = False
     return {"status": "ok"}
 
 
@@ -286,39 +407,98 @@ async def ios_shutdown_simulator(device_id: str):
 @router.get("/ios/{device_id}/screenshot", response_model=ScreenshotResponse)
 async def ios_screenshot(device_id: str):
     """Take a screenshot from an iOS simulator"""
-    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-        temp_path = f.name
+    # "-" makes simctl write the PNG to stdout instead of a file
+    png = await run_xcrun_binary(["io", device_id, "screenshot", "--type=png", "-"])
+    return ScreenshotResponse(screenshot=base64.b64encode(png).decode("ascii"))
 
-    try:
-        await run_xcrun_command(["io", device_id, "screenshot", temp_path])
 
-        with open(temp_path, "rb") as f:
-            screenshot_data = base64.b64encode(f.read()).decode()
+async def run_input_command(cmd: List[str]) -> None:
+    """Run a host-side input command (cliclick/osascript), raising if it fails"""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
 
-        return ScreenshotResponse(screenshot=screenshot_data)
-    finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+    if process.returncode != 0:
+        raise HTTPException(
+            status_code=500, detail=f"Input error: {stderr.decode()}"
+        )
+
+
+async def tap_simulator(x: int, y: int) -> None:
+    """Click at host screen coordinates: Quartz, then cliclick, then osascript"""
+    if CGEventPost is not None:
+        post_click(x, y)
+        return
+
+    if CLICLICK:
+        cmd = [CLICLICK, f"c:{x},{y}"]
+    else:
+        # Fixed script, coordinates passed as arguments
+        cmd = ["osascript", *await ios_tap_script_args(), str(x), str(y)]
+    await run_input_command(cmd)
 
 
 @router.post("/ios/{device_id}/tap")
 async def ios_tap(device_id: str, request: TapRequest):
-    """Tap on the iOS simulator screen"""
-    # Use AppleScript to send click events
-    script = f'''
-    tell application "Simulator"
-        activate
-    end tell
-    tell application "System Events"
-        click at {{{request.x}, {request.y}}}
-    end tell
-    '''
-    process = await asyncio.create_subprocess_exec(
-        "osascript", "-e", script,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    await process.communicate()
+    """Tap on the iOS simulator screen
+
+    Clicks land on the frontmost Simulator window at host screen coordinates;
+    device_id keeps the route shaped like the other per-device endpoints.
+    """
+    await ensure_simulator_active()
+    await tap_simulator(request.x, request.y)
+    return {"status": "ok"}
+
+
+def compile_ios_action(action: InputAction) -> List[str]:
+    """Compile one input action to cliclick commands"""
+    try:
+        if action.type == "tap":
+            return [f"c:{int(action.x)},{int(action.y)}"]
+        if action.type == "swipe":
+            return [
+                f"dd:{int(action.x)},{int(action.y)}",
+                f"w:{int(action.duration_ms)}",
+                f"dm:{int(action.end_x)},{int(action.end_y)}",
+                f"du:{int(action.end_x)},{int(action.end_y)}",
+            ]
+        if action.type == "text":
+            return [f"t:{action.text}"]
+    except (TypeError, AttributeError):
+        raise HTTPException(
+            status_code=400, detail=f"Missing fields for '{action.type}' action"
+        )
+    raise HTTPException(status_code=400, detail=f"Unknown action type: {action.type}")
+
+
+@router.post("/ios/{device_id}/script")
+async def ios_run_script(device_id: str, request: InputScriptRequest):
+    """Run several input actions, as a single cliclick invocation when available
+
+    Like tap, this drives the frontmost Simulator window. Without cliclick, taps
+    use the same fallbacks as the tap endpoint and text is typed through simctl
+    on device_id; only swipes need cliclick.
+    """
+    if not request.actions:
+        return {"status": "ok"}
+    # Compiling validates every action before any of them runs
+    commands = [compile_ios_action(action) for action in request.actions]
+    if not CLICLICK and any(action.type == "swipe" for action in request.actions):
+        raise HTTPException(status_code=500, detail="cliclick not found (required for iOS swipes)")
+
+    await ensure_simulator_active()
+    if CLICLICK:
+        await run_input_command([CLICLICK, *(arg for command in commands for arg in command)])
+        return {"status": "ok"}
+
+    for action in request.actions:
+        if action.type == "tap":
+            await tap_simulator(action.x, action.y)
+        else:
+            await run_xcrun_command(["io", device_id, "type", action.text])
     return {"status": "ok"}
 
 
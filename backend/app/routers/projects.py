@@ -1,17 +1,23 @@
-import uuid
 from typing import List, Optional
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import database, get_db
 from app.models import Project, ProjectCreate, ProjectUpdate, ProjectResponse
+from app.services.http_client import get_http_client
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+SEARCH_LIMIT = 50
+PROBE_TIMEOUT = httpx.Timeout(3.0, connect=2.0)
+PROJECT_SEARCH_MATCH = text(
+    "projects.id IN (SELECT project_id FROM projects_search WHERE projects_search MATCH :phrase)"
+)
+
 
 class ConnectRequest(BaseModel):
     """Schema for connect to running app request"""
@@ -30,30 +36,39 @@ class ConnectResponse(BaseModel):
 @router.post("", response_model=ProjectResponse)
 async def create_project(data: ProjectCreate, db: AsyncSession = Depends(get_db)):
     """Create a new project"""
-    project = Project(
-        id=str(uuid.uuid4()),
-        name=data.name,
-        description=data.description,
-        app_url=data.app_url,
-        repo_url=data.repo_url,
-        project_type=data.project_type,
+    result = await db.execute(
+        insert(Project)
+        .values(
+            name=data.name,
+            description=data.description,
+            app_url=data.app_url,
+            repo_url=data.repo_url,
+            project_type=data.project_type,
+        )
+        .returning(Project)
     )
-    db.add(project)
+    project = result.scalar_one()
     await db.commit()
-    await db.refresh(project)
     return project
 
 
 @router.post("/connect", response_model=ConnectResponse)
-async def connect_to_app(data: ConnectRequest, db: AsyncSession = Depends(get_db)):
+async def connect_to_app(
+    data: ConnectRequest,
+    db: AsyncSession = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Connect to a running app and create a project"""
     # Validate URL is reachable
     connected = False
     error = None
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(data.app_url)
-            connected = response.status_code < 500
+        # Only the status line matters, so never download the page body
+        response = await client.head(data.app_url, timeout=PROBE_TIMEOUT)
+        if response.status_code in (405, 501):
+            async with client.stream("GET", data.app_url, timeout=PROBE_TIMEOUT) as response:
+                pass
+        connected = response.status_code < 500
     except httpx.ConnectError:
         error = "Connection refused - is the app running?"
     except httpx.TimeoutException:
@@ -79,31 +94,38 @@ async def connect_to_app(data: ConnectRequest, db: AsyncSession = Depends(get_db
             project_name = "my-app"
 
     # Create project
-    project = Project(
-        id=str(uuid.uuid4()),
-        name=project_name,
-        app_url=data.app_url,
-        project_type=data.project_type,
+    result = await db.execute(
+        insert(Project)
+        .values(
+            name=project_name,
+            app_url=data.app_url,
+            project_type=data.project_type,
+        )
+        .returning(Project)
     )
-    db.add(project)
+    project = result.scalar_one()
     await db.commit()
-    await db.refresh(project)
 
     return ConnectResponse(project=project, connected=True)
 
 
-@router.get("", response_model=List[ProjectResponse])
+def _project_rows(rows) -> List[ProjectResponse]:
+    """Build responses from trusted table rows without re-validating them"""
+    return [ProjectResponse.model_construct(**row) for row in rows]
+
+
+@router.get("", response_model=None, responses={200: {"model": List[ProjectResponse]}})
 async def list_projects(db: AsyncSession = Depends(get_db)):
     """List all projects"""
-    result = await db.execute(select(Project).order_by(Project.updated_at.desc()))
-    return result.scalars().all()
+    projects = Project.__table__
+    result = await db.execute(select(projects).order_by(projects.c.updated_at.desc()))
+    return _project_rows(result.mappings())
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(project_id: str, db: AsyncSession = Depends(get_db)):
     """Get a project by ID"""
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -114,39 +136,50 @@ async def update_project(
     project_id: str, data: ProjectUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update a project"""
-    result = await db.execute(select(Project).where(Project.id == project_id))
+    result = await db.execute(
+        update(Project)
+        .where(Project.id == project_id)
+        .values(**data.model_dump(exclude_unset=True))
+        .returning(Project)
+    )
     project = result.scalar_one_or_none()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    update_data = data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(project, key, value)
-
     await db.commit()
-    await db.refresh(project)
     return project
 
 
 @router.delete("/{project_id}")
 async def delete_project(project_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a project"""
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
-    if not project:
+    result = await db.execute(
+        delete(Project).where(Project.id == project_id).returning(Project.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    await db.delete(project)
     await db.commit()
     return {"status": "deleted"}
 
 
-@router.get("/search/{query}", response_model=List[ProjectResponse])
+@router.get(
+    "/search/{query}", response_model=None, responses={200: {"model": List[ProjectResponse]}}
+)
 async def search_projects(query: str, db: AsyncSession = Depends(get_db)):
     """Search projects by name or description"""
+    if len(query) >= 3 and database.project_search_available:
+        # Quoted as a single FTS phrase: a case-insensitive substring match
+        phrase = '"' + query.replace('"', '""') + '"'
+        condition = PROJECT_SEARCH_MATCH.bindparams(phrase=phrase)
+    else:
+        # Trigram index cannot match fewer than three characters (or is unavailable)
+        condition = (Project.name.ilike(f"%{query}%")) | (Project.description.ilike(f"%{query}%"))
+
     result = await db.execute(
-        select(Project).where(
-            (Project.name.ilike(f"%{query}%")) | (Project.description.ilike(f"%{query}%"))
-        )
+        select(Project.__table__)
+        .where(condition)
+        .order_by(Project.updated_at.desc())
+        .limit(SEARCH_LIMIT)
     )
-    return result.scalars().all()
+    return _project_rows(result.mappings())
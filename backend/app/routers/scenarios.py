@@ -1,11 +1,12 @@
-import uuid
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import delete, insert, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.db import get_db
+from app.db.database import GENERATE_ID_SQL
 from app.models import (
     Scenario,
     ScenarioCreate,
@@ -13,7 +14,6 @@ from app.models import (
     ScenarioResponse,
     ScenarioWithSteps,
     Step,
-    StepResponse,
 )
 
 router = APIRouter(prefix="/scenarios", tags=["scenarios"])
@@ -22,16 +22,18 @@ router = APIRouter(prefix="/scenarios", tags=["scenarios"])
 @router.post("", response_model=ScenarioResponse)
 async def create_scenario(data: ScenarioCreate, db: AsyncSession = Depends(get_db)):
     """Create a new scenario"""
-    scenario = Scenario(
-        id=str(uuid.uuid4()),
-        test_case_id=data.test_case_id,
-        name=data.name,
-        description=data.description,
-        target_url=data.target_url,
+    result = await db.execute(
+        insert(Scenario)
+        .values(
+            test_case_id=data.test_case_id,
+            name=data.name,
+            description=data.description,
+            target_url=data.target_url,
+        )
+        .returning(Scenario)
     )
-    db.add(scenario)
+    scenario = result.scalar_one()
     await db.commit()
-    await db.refresh(scenario)
     return scenario
 
 
@@ -49,8 +51,7 @@ async def list_scenarios_by_test_case(test_case_id: str, db: AsyncSession = Depe
 @router.get("/{scenario_id}", response_model=ScenarioResponse)
 async def get_scenario(scenario_id: str, db: AsyncSession = Depends(get_db)):
     """Get a scenario by ID"""
-    result = await db.execute(select(Scenario).where(Scenario.id == scenario_id))
-    scenario = result.scalar_one_or_none()
+    scenario = await db.get(Scenario, scenario_id)
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
     return scenario
@@ -59,26 +60,15 @@ async def get_scenario(scenario_id: str, db: AsyncSession = Depends(get_db)):
 @router.get("/{scenario_id}/with-steps", response_model=ScenarioWithSteps)
 async def get_scenario_with_steps(scenario_id: str, db: AsyncSession = Depends(get_db)):
     """Get a scenario with all its steps"""
-    result = await db.execute(select(Scenario).where(Scenario.id == scenario_id))
+    result = await db.execute(
+        select(Scenario)
+        .where(Scenario.id == scenario_id)
+        .options(selectinload(Scenario.steps))
+    )
     scenario = result.scalar_one_or_none()
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
-
-    steps_result = await db.execute(
-        select(Step).where(Step.scenario_id == scenario_id).order_by(Step.step_order)
-    )
-    steps = steps_result.scalars().all()
-
-    return ScenarioWithSteps(
-        id=scenario.id,
-        test_case_id=scenario.test_case_id,
-        name=scenario.name,
-        description=scenario.description,
-        target_url=scenario.target_url,
-        created_at=scenario.created_at,
-        updated_at=scenario.updated_at,
-        steps=[StepResponse.model_validate(s) for s in steps],
-    )
+    return scenario
 
 
 @router.put("/{scenario_id}", response_model=ScenarioResponse)
@@ -86,29 +76,29 @@ async def update_scenario(
     scenario_id: str, data: ScenarioUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update a scenario"""
-    result = await db.execute(select(Scenario).where(Scenario.id == scenario_id))
+    result = await db.execute(
+        update(Scenario)
+        .where(Scenario.id == scenario_id)
+        .values(**data.model_dump(exclude_unset=True))
+        .returning(Scenario)
+    )
     scenario = result.scalar_one_or_none()
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
 
-    update_data = data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(scenario, key, value)
-
     await db.commit()
-    await db.refresh(scenario)
     return scenario
 
 
 @router.delete("/{scenario_id}")
 async def delete_scenario(scenario_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a scenario"""
-    result = await db.execute(select(Scenario).where(Scenario.id == scenario_id))
-    scenario = result.scalar_one_or_none()
-    if not scenario:
+    result = await db.execute(
+        delete(Scenario).where(Scenario.id == scenario_id).returning(Scenario.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Scenario not found")
 
-    await db.delete(scenario)
     await db.commit()
     return {"status": "deleted"}
 
@@ -118,39 +108,37 @@ async def duplicate_scenario(
     scenario_id: str, new_name: str = None, db: AsyncSession = Depends(get_db)
 ):
     """Duplicate a scenario with all its steps"""
-    result = await db.execute(select(Scenario).where(Scenario.id == scenario_id))
-    scenario = result.scalar_one_or_none()
+    scenario = await db.get(Scenario, scenario_id)
     if not scenario:
         raise HTTPException(status_code=404, detail="Scenario not found")
 
     # Create new scenario
-    new_scenario = Scenario(
-        id=str(uuid.uuid4()),
-        test_case_id=scenario.test_case_id,
-        name=new_name or f"{scenario.name} (Copy)",
-        description=scenario.description,
-        target_url=scenario.target_url,
-    )
-    db.add(new_scenario)
-    await db.flush()
-
-    # Duplicate steps
-    steps_result = await db.execute(
-        select(Step).where(Step.scenario_id == scenario_id).order_by(Step.step_order)
+    result = await db.execute(
+        insert(Scenario)
+        .values(
+            test_case_id=scenario.test_case_id,
+            name=new_name or f"{scenario.name} (Copy)",
+            description=scenario.description,
+            target_url=scenario.target_url,
+        )
+        .returning(Scenario)
     )
-    steps = steps_result.scalars().all()
-
-    for step in steps:
-        new_step = Step(
-            id=str(uuid.uuid4()),
-            scenario_id=new_scenario.id,
-            step_order=step.step_order,
-            step_type=step.step_type,
-            label=step.label,
-            config=step.config,
+    new_scenario = result.scalar_one()
+
+    # Copy steps server-side with INSERT ... SELECT
+    await db.execute(
+        insert(Step).from_select(
+            ["id", "scenario_id", "step_order", "step_type", "label", "config"],
+            select(
+                GENERATE_ID_SQL,
+                literal(new_scenario.id),
+                Step.step_order,
+                Step.step_type,
+                Step.label,
+                Step.config,
+            ).where(Step.scenario_id == scenario_id),
         )
-        db.add(new_step)
+    )
 
     await db.commit()
-    await db.refresh(new_scenario)
     return new_scenario
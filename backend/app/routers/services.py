@@ -1,15 +1,30 @@
+import asyncio
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 import httpx
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 from app.config import settings
+from app.services.http_client import coalesce, get_http_client
 
 router = APIRouter(prefix="/services", tags=["services"])
 
+SERVICE_URLS = {
+    "ai_agent": settings.ai_agent_url,
+    "test_runner": settings.test_runner_url,
+}
+
+# Checks run concurrently, so the slowest service bounds the total; 5s leaves
+# room for a slow start (e.g. the AI agent's first request)
+HEALTH_TIMEOUT = httpx.Timeout(5.0)
+
+# Recent results are reused so bursts of dashboard polling hit each service once
+HEALTH_CACHE_TTL = 3.0
+_health_cache: Dict[str, "ServiceHealth"] = {}
+
 
 class ServiceHealth(BaseModel):
     name: str
@@ -25,31 +40,34 @@ class ServiceUrls(BaseModel):
     test_runner: str
 
 
-async def check_service(name: str, url: str) -> ServiceHealth:
+# Settings are frozen, so the URLs never change for the process lifetime
+SERVICE_URLS_RESPONSE = ServiceUrls(**SERVICE_URLS)
+
+
+async def check_service(name: str, url: str, client: httpx.AsyncClient) -> ServiceHealth:
     """Check health of a single service"""
     start_time = time.time()
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{url}/health")
-            response_time_ms = int((time.time() - start_time) * 1000)
-
-            if response.status_code == 200:
-                data = response.json()
-                return ServiceHealth(
-                    name=name,
-                    status="Running",
-                    response_time_ms=response_time_ms,
-                    details=data,
-                    checked_at=time.time(),
-                )
-            else:
-                return ServiceHealth(
-                    name=name,
-                    status="Unhealthy",
-                    response_time_ms=response_time_ms,
-                    error=f"Status code: {response.status_code}",
-                    checked_at=time.time(),
-                )
+        response = await client.get(f"{url}/health", timeout=HEALTH_TIMEOUT)
+        response_time_ms = int((time.time() - start_time) * 1000)
+
+        if response.status_code == 200:
+            data = response.json()
+            return ServiceHealth(
+                name=name,
+                status="Running",
+                response_time_ms=response_time_ms,
+                details=data,
+                checked_at=time.time(),
+            )
+        else:
+            return ServiceHealth(
+                name=name,
+                status="Unhealthy",
+                response_time_ms=response_time_ms,
+                error=f"Status code: {response.status_code}",
+                checked_at=time.time(),
+            )
     except httpx.ConnectError:
         return ServiceHealth(
             name=name,
@@ -66,15 +84,23 @@ async def check_service(name: str, url: str) -> ServiceHealth:
         )
 
 
+async def cached_check_service(name: str, url: str, client: httpx.AsyncClient) -> ServiceHealth:
+    """Check a service, reusing a result younger than HEALTH_CACHE_TTL"""
+    cached = _health_cache.get(name)
+    if cached is not None and time.time() - cached.checked_at < HEALTH_CACHE_TTL:
+        return cached
+
+    health = await coalesce(("service-health", name), lambda: check_service(name, url, client))
+    _health_cache[name] = health
+    return health
+
+
 @router.get("/health/{service_name}", response_model=ServiceHealth)
-async def check_service_health(service_name: str):
+async def check_service_health(
+    service_name: str, client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Check health of a specific service"""
-    service_urls = {
-        "ai_agent": settings.ai_agent_url,
-        "test_runner": settings.test_runner_url,
-    }
-
-    if service_name not in service_urls:
+    if service_name not in SERVICE_URLS:
         return ServiceHealth(
             name=service_name,
             status="Error",
@@ -82,29 +108,19 @@ async def check_service_health(service_name: str):
             checked_at=time.time(),
         )
 
-    return await check_service(service_name, service_urls[service_name])
+    return await cached_check_service(service_name, SERVICE_URLS[service_name], client)
 
 
 @router.get("/health", response_model=List[ServiceHealth])
-async def check_all_services_health():
+async def check_all_services_health(client: httpx.AsyncClient = Depends(get_http_client)):
     """Check health of all services"""
-    services = [
-        ("ai_agent", settings.ai_agent_url),
-        ("test_runner", settings.test_runner_url),
-    ]
-
-    results = []
-    for name, url in services:
-        health = await check_service(name, url)
-        results.append(health)
-
-    return results
+    # Checked concurrently, so the slowest service bounds the latency
+    return await asyncio.gather(
+        *(cached_check_service(name, url, client) for name, url in SERVICE_URLS.items())
+    )
 
 
 @router.get("/urls", response_model=ServiceUrls)
 async def get_service_urls():
     """Get service URLs"""
-    return ServiceUrls(
-        ai_agent=settings.ai_agent_url,
-        test_runner=settings.test_runner_url,
-    )
+    return SERVICE_URLS_RESPONSE
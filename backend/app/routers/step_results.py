@@ -1,12 +1,12 @@
-import uuid
 from typing import List
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
 from app.models import StepResult, StepResultCreate, StepResultResponse
+from app.services.etag import collection_etag, not_modified
 
 router = APIRouter(prefix="/step-results", tags=["step-results"])
 
@@ -14,25 +14,52 @@ router = APIRouter(prefix="/step-results", tags=["step-results"])
 @router.post("", response_model=StepResultResponse)
 async def create_step_result(data: StepResultCreate, db: AsyncSession = Depends(get_db)):
     """Create a new step result"""
-    step_result = StepResult(
-        id=str(uuid.uuid4()),
-        test_run_id=data.test_run_id,
-        step_id=data.step_id,
-        test_case_id=data.test_case_id,
-        status=data.status,
-        duration_ms=data.duration_ms,
-        error_message=data.error_message,
-        screenshot_path=data.screenshot_path,
+    result = await db.execute(
+        insert(StepResult)
+        .values(
+            test_run_id=data.test_run_id,
+            step_id=data.step_id,
+            test_case_id=data.test_case_id,
+            status=data.status,
+            duration_ms=data.duration_ms,
+            error_message=data.error_message,
+            screenshot_path=data.screenshot_path,
+        )
+        .returning(StepResult)
     )
-    db.add(step_result)
+    step_result = result.scalar_one()
     await db.commit()
-    await db.refresh(step_result)
     return step_result
 
 
+@router.post("/bulk", response_model=List[StepResultResponse])
+async def bulk_create_step_results(
+    results: List[StepResultCreate], db: AsyncSession = Depends(get_db)
+):
+    """Create multiple step results with a single INSERT"""
+    if not results:
+        return []
+
+    result = await db.scalars(
+        insert(StepResult).returning(StepResult, sort_by_parameter_order=True),
+        [data.model_dump() for data in results],
+    )
+    step_results = result.all()
+    await db.commit()
+    return step_results
+
+
 @router.get("/test-run/{test_run_id}", response_model=List[StepResultResponse])
-async def list_step_results(test_run_id: str, db: AsyncSession = Depends(get_db)):
+async def list_step_results(
+    test_run_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)
+):
     """List all step results for a test run"""
+    # Step results are never updated, so created_at tracks every change
+    etag = await collection_etag(db, StepResult.created_at, StepResult.test_run_id == test_run_id)
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers["ETag"] = etag
+
     result = await db.execute(
         select(StepResult)
         .where(StepResult.test_run_id == test_run_id)
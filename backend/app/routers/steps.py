@@ -1,13 +1,12 @@
-import uuid
-import json
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import case, delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
 from app.models import Step, StepCreate, StepUpdate, StepResponse, StepConfig
+from app.services.etag import collection_etag, not_modified
 
 router = APIRouter(prefix="/steps", tags=["steps"])
 
@@ -15,24 +14,32 @@ router = APIRouter(prefix="/steps", tags=["steps"])
 @router.post("", response_model=StepResponse)
 async def create_step(data: StepCreate, db: AsyncSession = Depends(get_db)):
     """Create a new step"""
-    config_json = json.dumps(data.config.model_dump() if data.config else {})
-    step = Step(
-        id=str(uuid.uuid4()),
-        scenario_id=data.scenario_id,
-        step_order=data.step_order,
-        step_type=data.step_type,
-        label=data.label,
-        config=config_json,
+    result = await db.execute(
+        insert(Step)
+        .values(
+            scenario_id=data.scenario_id,
+            step_order=data.step_order,
+            step_type=data.step_type,
+            label=data.label,
+            config=data.config.model_dump() if data.config else {},
+        )
+        .returning(Step)
     )
-    db.add(step)
+    step = result.scalar_one()
     await db.commit()
-    await db.refresh(step)
     return step
 
 
 @router.get("/scenario/{scenario_id}", response_model=List[StepResponse])
-async def list_steps_by_scenario(scenario_id: str, db: AsyncSession = Depends(get_db)):
+async def list_steps_by_scenario(
+    scenario_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)
+):
     """List all steps for a scenario"""
+    etag = await collection_etag(db, Step.updated_at, Step.scenario_id == scenario_id)
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers["ETag"] = etag
+
     result = await db.execute(
         select(Step).where(Step.scenario_id == scenario_id).order_by(Step.step_order)
     )
@@ -42,8 +49,7 @@ async def list_steps_by_scenario(scenario_id: str, db: AsyncSession = Depends(ge
 @router.get("/{step_id}", response_model=StepResponse)
 async def get_step(step_id: str, db: AsyncSession = Depends(get_db)):
     """Get a step by ID"""
-    result = await db.execute(select(Step).where(Step.id == step_id))
-    step = result.scalar_one_or_none()
+    step = await db.get(Step, step_id)
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
     return step
@@ -54,20 +60,17 @@ async def update_step(
     step_id: str, data: StepUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update a step"""
-    result = await db.execute(select(Step).where(Step.id == step_id))
+    result = await db.execute(
+        update(Step)
+        .where(Step.id == step_id)
+        .values(**data.model_dump(exclude_unset=True))
+        .returning(Step)
+    )
     step = result.scalar_one_or_none()
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
 
-    update_data = data.model_dump(exclude_unset=True)
-    if "config" in update_data and update_data["config"]:
-        update_data["config"] = json.dumps(update_data["config"])
-
-    for key, value in update_data.items():
-        setattr(step, key, value)
-
     await db.commit()
-    await db.refresh(step)
     return step
 
 
@@ -76,26 +79,44 @@ async def update_step_config(
     step_id: str, config: StepConfig, db: AsyncSession = Depends(get_db)
 ):
     """Update just the config of a step"""
-    result = await db.execute(select(Step).where(Step.id == step_id))
+    result = await db.execute(
+        update(Step)
+        .where(Step.id == step_id)
+        .values(config=config.model_dump())
+        .returning(Step)
+    )
     step = result.scalar_one_or_none()
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
 
-    step.config = json.dumps(config.model_dump())
     await db.commit()
-    await db.refresh(step)
     return step
 
 
+@router.delete("/bulk")
+async def bulk_delete_steps(step_ids: List[str], db: AsyncSession = Depends(get_db)):
+    """Delete multiple steps at once"""
+    if not step_ids:
+        return {"deleted": 0}
+
+    result = await db.execute(
+        delete(Step)
+        .where(Step.id.in_(step_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return {"deleted": result.rowcount}
+
+
 @router.delete("/{step_id}")
 async def delete_step(step_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a step"""
-    result = await db.execute(select(Step).where(Step.id == step_id))
-    step = result.scalar_one_or_none()
-    if not step:
+    result = await db.execute(
+        delete(Step).where(Step.id == step_id).returning(Step.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Step not found")
 
-    await db.delete(step)
     await db.commit()
     return {"status": "deleted"}
 
@@ -105,51 +126,42 @@ async def reorder_steps(
     scenario_id: str, step_ids: List[str], db: AsyncSession = Depends(get_db)
 ):
     """Reorder steps in a scenario"""
-    for order, step_id in enumerate(step_ids):
-        result = await db.execute(
-            select(Step).where(Step.id == step_id, Step.scenario_id == scenario_id)
+    if step_ids:
+        # One UPDATE for the whole list: step_order = CASE id WHEN ... END
+        await db.execute(
+            update(Step)
+            .where(Step.scenario_id == scenario_id, Step.id.in_(step_ids))
+            .values(
+                step_order=case(
+                    {step_id: order for order, step_id in enumerate(step_ids)},
+                    value=Step.id,
+                )
+            )
+            .execution_options(synchronize_session=False)
         )
-        step = result.scalar_one_or_none()
-        if step:
-            step.step_order = order
-
-    await db.commit()
+        await db.commit()
     return {"status": "reordered"}
 
 
 @router.post("/bulk", response_model=List[StepResponse])
 async def bulk_create_steps(steps: List[StepCreate], db: AsyncSession = Depends(get_db)):
-    """Create multiple steps at once"""
-    created_steps = []
-    for data in steps:
-        config_json = json.dumps(data.config.model_dump() if data.config else {})
-        step = Step(
-            id=str(uuid.uuid4()),
-            scenario_id=data.scenario_id,
-            step_order=data.step_order,
-            step_type=data.step_type,
-            label=data.label,
-            config=config_json,
-        )
-        db.add(step)
-        created_steps.append(step)
-
+    """Create multiple steps with a single INSERT"""
+    if not steps:
+        return []
+
+    result = await db.scalars(
+        insert(Step).returning(Step, sort_by_parameter_order=True),
+        [
+            {
+                "scenario_id": data.scenario_id,
+                "step_order": data.step_order,
+                "step_type": data.step_type,
+                "label": data.label,
+                "config": data.config.model_dump() if data.config else {},
+            }
+            for data in steps
+        ],
+    )
+    created_steps = result.all()
     await db.commit()
-    for step in created_steps:
-        await db.refresh(step)
     return created_steps
-
-
-@router.delete("/bulk")
-async def bulk_delete_steps(step_ids: List[str], db: AsyncSession = Depends(get_db)):
-    """Delete multiple steps at once"""
-    deleted_count = 0
-    for step_id in step_ids:
-        result = await db.execute(select(Step).where(Step.id == step_id))
-        step = result.scalar_one_or_none()
-        if step:
-            await db.delete(step)
-            deleted_count += 1
-
-    await db.commit()
-    return {"deleted": deleted_count}
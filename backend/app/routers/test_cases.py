@@ -1,11 +1,12 @@
-import uuid
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, insert, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import AsyncSessionLocal, get_db
 from app.models import (
     TestCase,
     TestCaseCreate,
@@ -15,30 +16,49 @@ from app.models import (
     CategoryCount,
     PriorityCount,
 )
+from app.services.etag import collection_etag, not_modified
 
 router = APIRouter(prefix="/test-cases", tags=["test-cases"])
 
+STREAM_BATCH_SIZE = 200
+
 
 @router.post("", response_model=TestCaseResponse)
 async def create_test_case(data: TestCaseCreate, db: AsyncSession = Depends(get_db)):
     """Create a new test case"""
-    test_case = TestCase(
-        id=str(uuid.uuid4()),
-        project_id=data.project_id,
-        name=data.name,
-        description=data.description,
-        category=data.category,
-        priority=data.priority,
-        test_type=data.test_type,
+    result = await db.execute(
+        insert(TestCase)
+        .values(
+            project_id=data.project_id,
+            name=data.name,
+            description=data.description,
+            category=data.category,
+            priority=data.priority,
+            test_type=data.test_type,
+        )
+        .returning(TestCase)
     )
-    db.add(test_case)
+    test_case = result.scalar_one()
     await db.commit()
-    await db.refresh(test_case)
     return test_case
 
 
-@router.get("", response_model=List[TestCaseResponse])
+async def _stream_json_array(query) -> AsyncIterator[bytes]:
+    """Stream Core query rows as a JSON array, one fetched batch at a time"""
+    # The request's get_db session may be closed before the body is sent,
+    # so the stream owns its session
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        separator = b"["
+        async for rows in result.mappings().partitions():
+            yield separator + b",".join(orjson.dumps(dict(row)) for row in rows)
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+
+@router.get("", response_model=None, responses={200: {"model": List[TestCaseResponse]}})
 async def list_test_cases(
+    request: Request,
     project_id: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
@@ -47,22 +67,28 @@ async def list_test_cases(
     db: AsyncSession = Depends(get_db),
 ):
     """List test cases with optional filters"""
-    query = select(TestCase)
+    test_cases = TestCase.__table__
+    conditions = []
 
     if project_id:
-        query = query.where(TestCase.project_id == project_id)
+        conditions.append(test_cases.c.project_id == project_id)
     if category:
-        query = query.where(TestCase.category == category)
+        conditions.append(test_cases.c.category == category)
     if priority:
-        query = query.where(TestCase.priority == priority)
+        conditions.append(test_cases.c.priority == priority)
     if status:
-        query = query.where(TestCase.status == status)
+        conditions.append(test_cases.c.status == status)
     if test_type:
-        query = query.where(TestCase.test_type == test_type)
+        conditions.append(test_cases.c.test_type == test_type)
 
-    query = query.order_by(TestCase.updated_at.desc())
-    result = await db.execute(query)
-    return result.scalars().all()
+    etag = await collection_etag(db, test_cases.c.updated_at, *conditions)
+    if cached := not_modified(request, etag):
+        return cached
+
+    query = select(test_cases).where(*conditions).order_by(test_cases.c.updated_at.desc())
+    return StreamingResponse(
+        _stream_json_array(query), media_type="application/json", headers={"ETag": etag}
+    )
 
 
 @router.get("/project/{project_id}", response_model=List[TestCaseResponse])
@@ -77,34 +103,26 @@ async def list_test_cases_by_project(project_id: str, db: AsyncSession = Depends
 
 
 @router.get("/stats/{project_id}", response_model=TestCaseStats)
-async def get_test_case_stats(project_id: str, db: AsyncSession = Depends(get_db)):
+async def get_test_case_stats(
+    project_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)
+):
     """Get statistics for test cases in a project"""
-    # Total counts by status
-    total_result = await db.execute(
-        select(func.count()).where(TestCase.project_id == project_id)
-    )
-    total = total_result.scalar() or 0
-
-    passed_result = await db.execute(
-        select(func.count()).where(
-            TestCase.project_id == project_id, TestCase.status == "success"
-        )
-    )
-    passed = passed_result.scalar() or 0
-
-    failed_result = await db.execute(
-        select(func.count()).where(
-            TestCase.project_id == project_id, TestCase.status == "failed"
-        )
-    )
-    failed = failed_result.scalar() or 0
-
-    pending_result = await db.execute(
-        select(func.count()).where(
-            TestCase.project_id == project_id, TestCase.status == "pending"
-        )
+    etag = await collection_etag(db, TestCase.updated_at, TestCase.project_id == project_id)
+    if cached := not_modified(request, etag):
+        return cached
+    response.headers["ETag"] = etag
+
+    # Counts by status in one grouped query; the total is their sum
+    status_result = await db.execute(
+        select(TestCase.status, func.count())
+        .where(TestCase.project_id == project_id)
+        .group_by(TestCase.status)
     )
-    pending = pending_result.scalar() or 0
+    counts = dict(status_result.all())
+    total = sum(counts.values())
+    passed = counts.get("success", 0)
+    failed = counts.get("failed", 0)
+    pending = counts.get("pending", 0)
 
     # By category
     category_result = await db.execute(
@@ -140,8 +158,7 @@ async def get_test_case_stats(project_id: str, db: AsyncSession = Depends(get_db
 @router.get("/{test_case_id}", response_model=TestCaseResponse)
 async def get_test_case(test_case_id: str, db: AsyncSession = Depends(get_db)):
     """Get a test case by ID"""
-    result = await db.execute(select(TestCase).where(TestCase.id == test_case_id))
-    test_case = result.scalar_one_or_none()
+    test_case = await db.get(TestCase, test_case_id)
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
     return test_case
@@ -152,17 +169,17 @@ async def update_test_case(
     test_case_id: str, data: TestCaseUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update a test case"""
-    result = await db.execute(select(TestCase).where(TestCase.id == test_case_id))
+    result = await db.execute(
+        update(TestCase)
+        .where(TestCase.id == test_case_id)
+        .values(**data.model_dump(exclude_unset=True))
+        .returning(TestCase)
+    )
     test_case = result.scalar_one_or_none()
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
 
-    update_data = data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(test_case, key, value)
-
     await db.commit()
-    await db.refresh(test_case)
     return test_case
 
 
@@ -171,12 +188,15 @@ async def update_test_case_status(
     test_case_id: str, status: str, db: AsyncSession = Depends(get_db)
 ):
     """Update the status of a test case"""
-    result = await db.execute(select(TestCase).where(TestCase.id == test_case_id))
-    test_case = result.scalar_one_or_none()
-    if not test_case:
+    result = await db.execute(
+        update(TestCase)
+        .where(TestCase.id == test_case_id)
+        .values(status=status)
+        .returning(TestCase.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Test case not found")
 
-    test_case.status = status
     await db.commit()
     return {"status": "updated"}
 
@@ -184,11 +204,11 @@ async def update_test_case_status(
 @router.delete("/{test_case_id}")
 async def delete_test_case(test_case_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a test case"""
-    result = await db.execute(select(TestCase).where(TestCase.id == test_case_id))
-    test_case = result.scalar_one_or_none()
-    if not test_case:
+    result = await db.execute(
+        delete(TestCase).where(TestCase.id == test_case_id).returning(TestCase.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Test case not found")
 
-    await db.delete(test_case)
     await db.commit()
     return {"status": "deleted"}
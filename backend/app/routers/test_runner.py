@@ -1,14 +1,26 @@
 """
 Test Runner API Router - Endpoints for running Cypress and Playwright tests
 """
+import asyncio
+import uuid
+
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Any, Coroutine, Dict, List, Optional, Union
 
 from ..services.test_runner import test_runner, TestFramework
 
 router = APIRouter(prefix="/test-runner", tags=["test-runner"])
 
+# Browsers each framework can drive; anything else falls back to the first listed
+CYPRESS_BROWSERS = frozenset({"chrome", "firefox", "electron"})
+PLAYWRIGHT_BROWSERS = frozenset({"chromium", "firefox", "webkit"})
+
+# Background test runs by job id, kept (oldest finished evicted first) so results can
+# be polled; new runs are refused while this many are still unfinished
+JOB_HISTORY_LIMIT = 100
+jobs: Dict[str, "asyncio.Task[Union[TestResult, List[TestResult]]]"] = {}
+
 
 class TestStep(BaseModel):
     type: str  # navigate, click, type, verify, wait
@@ -35,25 +47,43 @@ class RunSpecRequest(BaseModel):
     timeout: int = 60000
 
 
+class BatchSpec(BaseModel):
+    spec_content: str
+    base_url: str
+    timeout: int = 60000
+
+
+class RunBatchRequest(BaseModel):
+    specs: List[BatchSpec] = Field(max_length=50)
+    framework: TestFramework = TestFramework.CYPRESS
+    browser: str = "chrome"
+    headless: bool = True
+    concurrency: int = Field(default=4, ge=1, le=8)
+
+
 class TestResult(BaseModel):
     success: bool
     stdout: str
     stderr: str
     exit_code: int
     error: Optional[str] = None
+    results: Optional[Dict[str, Any]] = None  # Structured reporter output, when available
 
 
-@router.post("/run-steps", response_model=TestResult)
-async def run_test_steps(request: RunStepsRequest):
-    """
-    Run test steps using Cypress or Playwright
+class JobResponse(BaseModel):
+    job_id: str
+    status: str  # 'pending' | 'done' | 'failed'
+    result: Optional[TestResult] = None
+    results: Optional[List[TestResult]] = None  # Set instead of result for batch jobs
+    error: Optional[str] = None
 
-    Converts the provided test steps to a test spec and executes it.
-    """
+
+async def _run_steps(request: RunStepsRequest) -> TestResult:
+    """Convert test steps to a spec and execute it"""
     steps_dict = [step.model_dump() for step in request.steps]
 
     if request.framework == TestFramework.CYPRESS:
-        browser = request.browser if request.browser in ["chrome", "firefox", "electron"] else "chrome"
+        browser = request.browser if request.browser in CYPRESS_BROWSERS else "chrome"
         result = await test_runner.run_steps_as_cypress(
             steps=steps_dict,
             base_url=request.base_url,
@@ -61,7 +91,7 @@ async def run_test_steps(request: RunStepsRequest):
             headless=request.headless
         )
     else:
-        browser = request.browser if request.browser in ["chromium", "firefox", "webkit"] else "chromium"
+        browser = request.browser if request.browser in PLAYWRIGHT_BROWSERS else "chromium"
         result = await test_runner.run_steps_as_playwright(
             steps=steps_dict,
             base_url=request.base_url,
@@ -72,15 +102,10 @@ async def run_test_steps(request: RunStepsRequest):
     return TestResult(**result)
 
 
-@router.post("/run-spec", response_model=TestResult)
-async def run_test_spec(request: RunSpecRequest):
-    """
-    Run a raw test spec using Cypress or Playwright
-
-    Executes the provided spec content directly.
-    """
+async def _run_spec(request: RunSpecRequest) -> TestResult:
+    """Execute raw spec content"""
     if request.framework == TestFramework.CYPRESS:
-        browser = request.browser if request.browser in ["chrome", "firefox", "electron"] else "chrome"
+        browser = request.browser if request.browser in CYPRESS_BROWSERS else "chrome"
         result = await test_runner.run_cypress(
             spec_content=request.spec_content,
             base_url=request.base_url,
@@ -89,7 +114,7 @@ async def run_test_spec(request: RunSpecRequest):
             timeout=request.timeout
         )
     else:
-        browser = request.browser if request.browser in ["chromium", "firefox", "webkit"] else "chromium"
+        browser = request.browser if request.browser in PLAYWRIGHT_BROWSERS else "chromium"
         result = await test_runner.run_playwright(
             spec_content=request.spec_content,
             base_url=request.base_url,
@@ -101,15 +126,111 @@ async def run_test_spec(request: RunSpecRequest):
     return TestResult(**result)
 
 
+async def _run_batch(request: RunBatchRequest) -> List[TestResult]:
+    """Execute several specs concurrently with one framework"""
+    if request.framework == TestFramework.CYPRESS:
+        browser = request.browser if request.browser in CYPRESS_BROWSERS else "chrome"
+    else:
+        browser = request.browser if request.browser in PLAYWRIGHT_BROWSERS else "chromium"
+
+    results = await test_runner.run_batch(
+        [
+            {
+                "spec_content": spec.spec_content,
+                "base_url": spec.base_url,
+                "browser": browser,
+                "headless": request.headless,
+                "timeout": spec.timeout,
+            }
+            for spec in request.specs
+        ],
+        request.framework,
+        concurrency=request.concurrency,
+    )
+    return [TestResult(**result) for result in results]
+
+
+def _start_job(run: Coroutine[Any, Any, Union[TestResult, List[TestResult]]]) -> JobResponse:
+    """Run a test in the background and register it for polling"""
+    # Forget the oldest finished jobs once the history is full
+    for job_id in [job_id for job_id, task in jobs.items() if task.done()]:
+        if len(jobs) < JOB_HISTORY_LIMIT:
+            break
+        del jobs[job_id]
+    # Still full means every remaining job is pending or running
+    if len(jobs) >= JOB_HISTORY_LIMIT:
+        run.close()
+        raise HTTPException(status_code=429, detail="Too many test runs in progress")
+
+    job_id = str(uuid.uuid4())
+    jobs[job_id] = asyncio.create_task(run)
+    return JobResponse(job_id=job_id, status="pending")
+
+
+@router.post("/run-steps", response_model=JobResponse)
+async def run_test_steps(request: RunStepsRequest):
+    """
+    Run test steps using Cypress or Playwright
+
+    Converts the provided test steps to a test spec and starts executing it.
+    Poll GET /jobs/{job_id} for the result.
+    """
+    return _start_job(_run_steps(request))
+
+
+@router.post("/run-spec", response_model=JobResponse)
+async def run_test_spec(request: RunSpecRequest):
+    """
+    Run a raw test spec using Cypress or Playwright
+
+    Starts executing the provided spec content directly.
+    Poll GET /jobs/{job_id} for the result.
+    """
+    return _start_job(_run_spec(request))
+
+
+@router.post("/run-batch", response_model=JobResponse)
+async def run_test_batch(request: RunBatchRequest):
+    """
+    Run several raw test specs concurrently with Cypress or Playwright
+
+    At most `concurrency` browsers run at once. Poll GET /jobs/{job_id};
+    the finished job lists one result per spec, in request order.
+    """
+    return _start_job(_run_batch(request))
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the status, and once finished the result, of a test run job"""
+    task = jobs.get(job_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not task.done():
+        return JobResponse(job_id=job_id, status="pending")
+    if task.cancelled():
+        return JobResponse(job_id=job_id, status="failed", error="Job was cancelled")
+    if task.exception() is not None:
+        return JobResponse(job_id=job_id, status="failed", error=str(task.exception()))
+    result = task.result()
+    if isinstance(result, list):
+        return JobResponse(job_id=job_id, status="done", results=result)
+    return JobResponse(job_id=job_id, status="done", result=result)
+
+
 @router.get("/health")
 async def health_check():
     """Check if test runner is available"""
-    import shutil
-
-    npx_available = shutil.which("npx") is not None
+    # Same lookup the runs use: node_modules/.bin, then PATH, then npx
+    missing = [name for name in ("cypress", "playwright") if test_runner.cli_command(name) is None]
 
     return {
-        "status": "ok" if npx_available else "degraded",
-        "npx_available": npx_available,
-        "message": "Ready to run tests" if npx_available else "npx not found - install Node.js"
+        "status": "degraded" if missing else "ok",
+        "cypress_available": "cypress" not in missing,
+        "playwright_available": "playwright" not in missing,
+        "message": (
+            f"{' and '.join(missing)} not found - install it in node_modules or install Node.js"
+            if missing else "Ready to run tests"
+        )
     }
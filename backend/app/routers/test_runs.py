@@ -1,12 +1,11 @@
-import uuid
-from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import Integer, case, cast, delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import get_db
+from app.db.database import UTCNOW_SQL
 from app.models import (
     TestRun,
     TestRunCreate,
@@ -21,14 +20,16 @@ router = APIRouter(prefix="/test-runs", tags=["test-runs"])
 @router.post("", response_model=TestRunResponse)
 async def create_test_run(data: TestRunCreate, db: AsyncSession = Depends(get_db)):
     """Create a new test run"""
-    test_run = TestRun(
-        id=str(uuid.uuid4()),
-        project_id=data.project_id,
-        name=data.name,
+    result = await db.execute(
+        insert(TestRun)
+        .values(
+            project_id=data.project_id,
+            name=data.name,
+        )
+        .returning(TestRun)
     )
-    db.add(test_run)
+    test_run = result.scalar_one()
     await db.commit()
-    await db.refresh(test_run)
     return test_run
 
 
@@ -54,36 +55,20 @@ async def list_test_runs(
 @router.get("/summary/{project_id}", response_model=TestRunSummary)
 async def get_test_run_summary(project_id: str, db: AsyncSession = Depends(get_db)):
     """Get summary statistics for test runs in a project"""
-    total_result = await db.execute(
-        select(func.count()).where(TestRun.project_id == project_id)
-    )
-    total = total_result.scalar() or 0
-
-    passed_result = await db.execute(
-        select(func.count()).where(
-            TestRun.project_id == project_id, TestRun.status == "passed"
-        )
-    )
-    passed = passed_result.scalar() or 0
-
-    failed_result = await db.execute(
-        select(func.count()).where(
-            TestRun.project_id == project_id, TestRun.status == "failed"
-        )
+    result = await db.execute(
+        select(
+            func.count(),
+            func.sum(case((TestRun.status == "passed", 1), else_=0)),
+            func.sum(case((TestRun.status == "failed", 1), else_=0)),
+            func.avg(TestRun.duration_ms),
+        ).where(TestRun.project_id == project_id)
     )
-    failed = failed_result.scalar() or 0
-
-    avg_result = await db.execute(
-        select(func.avg(TestRun.duration_ms)).where(
-            TestRun.project_id == project_id, TestRun.duration_ms.isnot(None)
-        )
-    )
-    avg_duration = avg_result.scalar()
+    total, passed, failed, avg_duration = result.one()
 
     return TestRunSummary(
         total_runs=total,
-        passed_runs=passed,
-        failed_runs=failed,
+        passed_runs=passed or 0,
+        failed_runs=failed or 0,
         avg_duration_ms=avg_duration,
     )
 
@@ -91,8 +76,7 @@ async def get_test_run_summary(project_id: str, db: AsyncSession = Depends(get_d
 @router.get("/{test_run_id}", response_model=TestRunResponse)
 async def get_test_run(test_run_id: str, db: AsyncSession = Depends(get_db)):
     """Get a test run by ID"""
-    result = await db.execute(select(TestRun).where(TestRun.id == test_run_id))
-    test_run = result.scalar_one_or_none()
+    test_run = await db.get(TestRun, test_run_id)
     if not test_run:
         raise HTTPException(status_code=404, detail="Test run not found")
     return test_run
@@ -103,32 +87,39 @@ async def update_test_run(
     test_run_id: str, data: TestRunUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update a test run"""
-    result = await db.execute(select(TestRun).where(TestRun.id == test_run_id))
-    test_run = result.scalar_one_or_none()
+    update_data = data.model_dump(exclude_unset=True)
+    if update_data:
+        result = await db.execute(
+            update(TestRun)
+            .where(TestRun.id == test_run_id)
+            .values(**update_data)
+            .returning(TestRun)
+        )
+        test_run = result.scalar_one_or_none()
+    else:
+        # Nothing to SET (test runs have no updated_at), so just read it back
+        test_run = await db.get(TestRun, test_run_id)
     if not test_run:
         raise HTTPException(status_code=404, detail="Test run not found")
 
-    update_data = data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(test_run, key, value)
-
     await db.commit()
-    await db.refresh(test_run)
     return test_run
 
 
 @router.post("/{test_run_id}/start", response_model=TestRunResponse)
 async def start_test_run(test_run_id: str, db: AsyncSession = Depends(get_db)):
     """Start a test run"""
-    result = await db.execute(select(TestRun).where(TestRun.id == test_run_id))
+    result = await db.execute(
+        update(TestRun)
+        .where(TestRun.id == test_run_id)
+        .values(status="running", started_at=UTCNOW_SQL)
+        .returning(TestRun)
+    )
     test_run = result.scalar_one_or_none()
     if not test_run:
         raise HTTPException(status_code=404, detail="Test run not found")
 
-    test_run.status = "running"
-    test_run.started_at = datetime.utcnow()
     await db.commit()
-    await db.refresh(test_run)
     return test_run
 
 
@@ -141,35 +132,43 @@ async def complete_test_run(
     db: AsyncSession = Depends(get_db),
 ):
     """Complete a test run"""
-    result = await db.execute(select(TestRun).where(TestRun.id == test_run_id))
+    # Duration is measured by the database clock that also stamped started_at
+    elapsed_ms = cast(
+        (func.julianday(UTCNOW_SQL) - func.julianday(TestRun.started_at)) * 86400000,
+        Integer,
+    )
+    result = await db.execute(
+        update(TestRun)
+        .where(TestRun.id == test_run_id)
+        .values(
+            status="passed" if failed == 0 else "failed",
+            passed=passed,
+            failed=failed,
+            skipped=skipped,
+            completed_at=UTCNOW_SQL,
+            duration_ms=case(
+                (TestRun.started_at.isnot(None), elapsed_ms),
+                else_=TestRun.duration_ms,
+            ),
+        )
+        .returning(TestRun)
+    )
     test_run = result.scalar_one_or_none()
     if not test_run:
         raise HTTPException(status_code=404, detail="Test run not found")
 
-    test_run.status = "passed" if failed == 0 else "failed"
-    test_run.passed = passed
-    test_run.failed = failed
-    test_run.skipped = skipped
-    test_run.completed_at = datetime.utcnow()
-
-    if test_run.started_at:
-        test_run.duration_ms = int(
-            (test_run.completed_at - test_run.started_at).total_seconds() * 1000
-        )
-
     await db.commit()
-    await db.refresh(test_run)
     return test_run
 
 
 @router.delete("/{test_run_id}")
 async def delete_test_run(test_run_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a test run"""
-    result = await db.execute(select(TestRun).where(TestRun.id == test_run_id))
-    test_run = result.scalar_one_or_none()
-    if not test_run:
+    result = await db.execute(
+        delete(TestRun).where(TestRun.id == test_run_id).returning(TestRun.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Test run not found")
 
-    await db.delete(test_run)
     await db.commit()
     return {"status": "deleted"}
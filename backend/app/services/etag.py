@@ -0,0 +1,31 @@
+"""
+Conditional GET helpers - ETags derived from a collection's newest change
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def collection_etag(db: AsyncSession, changed_at, *conditions) -> str:
+    """ETag for the rows matching conditions, from their count and newest timestamp
+
+    Inserts and updates move the newest timestamp forward; deletes change the count.
+    """
+    result = await db.execute(select(func.count(), func.max(changed_at)).where(*conditions))
+    count, newest = result.one()
+    digest = hashlib.blake2b(f"{count}:{newest}".encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already holds this version, else None"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    if etag in tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -0,0 +1,46 @@
+"""
+Shared HTTP client - A single pooled httpx.AsyncClient for outbound calls
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+import httpx
+from fastapi import Request
+
+# Outbound calls currently in flight, keyed by what they fetch
+_inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the application-wide HTTP client (opened and closed by the lifespan)"""
+    return httpx.AsyncClient(
+        # HTTP/2 multiplexes concurrent requests to one host over a single connection
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=100),
+    )
+
+
+async def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Dependency to get the shared HTTP client"""
+    return request.app.state.http
+
+
+async def coalesce(key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Share one in-flight call between concurrent callers asking for the same key
+
+    The first caller starts ``factory()``; callers arriving before it finishes
+    await the same task instead of issuing a duplicate upstream request.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+
+        def _forget(done: "asyncio.Task[Any]") -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+
+        task.add_done_callback(_forget)
+    # Shield so one caller being cancelled does not cancel the others
+    return await asyncio.shield(task)
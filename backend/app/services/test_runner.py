@@ -2,14 +2,79 @@
 Test Runner Service - Executes Cypress and Playwright tests
 """
 import asyncio
+import atexit
+import io
 import subprocess
 import json
 import os
+import shutil
 import tempfile
+import uuid
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 from enum import Enum
 
+import orjson
+
+from app.config import settings
+
+# Static project configs written once per workspace; per-run values come from CLI flags/env
+CYPRESS_CONFIG = {
+    "e2e": {
+        "supportFile": "cypress/support/e2e.js",
+        "specPattern": "cypress/e2e/**/*.cy.{js,jsx,ts,tsx}",
+        "video": False,
+        "screenshotOnRunFailure": True,
+        # Runs share the workspace, so one run must not trash another's screenshots
+        "trashAssetsBeforeRuns": False
+    }
+}
+PLAYWRIGHT_CONFIG = """
+const { defineConfig } = require('@playwright/test');
+
+module.exports = defineConfig({
+  testDir: '.',
+  testMatch: '*.spec.js',
+  use: {
+    baseURL: process.env.PLAYWRIGHT_BASE_URL,
+  },
+});
+"""
+
+# Spec source emitted per step type; steps of any other type are skipped.
+# Fields are substituted as JSON literals, which are also valid JS literals
+CYPRESS_STEP_TEMPLATES = {
+    "navigate": "    cy.visit({url});\n",
+    "click": "    cy.get({selector}).click();\n",
+    "type": "    cy.get({selector}).type({value});\n",
+    "verify": "    cy.get({selector}).should('exist');\n",
+    "wait": "    cy.wait({duration});\n",
+}
+CYPRESS_SPEC_HEADER = "describe('Test', () => {\n  it('runs the test steps', () => {\n"
+CYPRESS_SPEC_FOOTER = "  });\n});\n"
+
+PLAYWRIGHT_STEP_TEMPLATES = {
+    "navigate": "  await page.goto({url});\n",
+    "click": "  await page.click({selector});\n",
+    "type": "  await page.fill({selector}, {value});\n",
+    "verify": "  await expect(page.locator({selector})).toBeVisible();\n",
+    "wait": "  await page.waitForTimeout({duration});\n",
+}
+PLAYWRIGHT_SPEC_HEADER = (
+    "const { test, expect } = require('@playwright/test');\n"
+    "\n"
+    "test('runs the test steps', async ({ page }) => {\n"
+)
+PLAYWRIGHT_SPEC_FOOTER = "});\n"
+
+# Extra seconds a batch item may take beyond its process timeout, so the process
+# timeout (which keeps partial output) fires first and the batch one is a backstop
+# for workspace I/O and process cleanup
+BATCH_TIMEOUT_MARGIN = 15
+
+# Longest single output line read from a test process (the StreamReader default is 64KB)
+OUTPUT_LINE_LIMIT = 1024 * 1024
+
 
 class TestFramework(str, Enum):
     CYPRESS = "cypress"
@@ -21,6 +86,49 @@ class TestRunner:
 
     def __init__(self):
         self.processes: Dict[str, subprocess.Popen] = {}
+        # CLI command prefixes, cached once resolved; a CLI not found yet is looked
+        # up again on the next call, so installing it needs no restart
+        self._cli_cmds: Dict[str, List[str]] = {}
+        # Environment for test processes, built once rather than copied per run
+        self._child_env = {**os.environ, "CI": "true"}
+        # One workspace per framework, reused by every run; only spec files change
+        self._cypress_workspace = self._create_cypress_workspace()
+        self._playwright_workspace = self._create_playwright_workspace()
+
+    @staticmethod
+    def _resolve_cli(name: str) -> Optional[List[str]]:
+        """Command prefix for a Node CLI: node_modules/.bin, then PATH, then npx"""
+        if settings.node_modules_path:
+            local_bin = Path(settings.node_modules_path) / ".bin" / name
+            if local_bin.is_file():
+                return [str(local_bin)]
+        path = shutil.which(name)
+        if path is not None:
+            return [path]
+        npx = shutil.which("npx")
+        if npx is not None:
+            return [npx, name]
+        return None
+
+    def cli_command(self, name: str) -> Optional[List[str]]:
+        """Command prefix for a Node CLI, or None if it cannot be run at all"""
+        cmd = self._cli_cmds.get(name)
+        if cmd is None:
+            cmd = self._resolve_cli(name)
+            if cmd is not None:
+                self._cli_cmds[name] = cmd
+        return cmd
+
+    @staticmethod
+    def _cli_not_found(name: str) -> Dict[str, Any]:
+        """Run result for a CLI that is neither installed nor reachable through npx"""
+        return {
+            "success": False,
+            "error": f"{name} not found. Install it in node_modules or install Node.js for npx.",
+            "stdout": "",
+            "stderr": "",
+            "exit_code": -1
+        }
 
     async def run_cypress(
         self,
@@ -28,7 +136,8 @@ class TestRunner:
         base_url: str,
         browser: str = "chrome",
         headless: bool = True,
-        timeout: int = 60000
+        timeout: int = 60000,
+        on_output: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Run a Cypress test from spec content
@@ -39,52 +148,37 @@ class TestRunner:
             browser: Browser to use (chrome, firefox, electron)
             headless: Run in headless mode
             timeout: Test timeout in ms
+            on_output: Called with each line of output as the test produces it
         """
-        # Create temp directory for the test
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Create minimal cypress structure
-            cypress_dir = temp_path / "cypress"
-            cypress_dir.mkdir()
-            (cypress_dir / "e2e").mkdir()
-            (cypress_dir / "support").mkdir()
-
-            # Write spec file
-            spec_file = cypress_dir / "e2e" / "test.cy.js"
-            spec_file.write_text(spec_content)
-
-            # Write support file
-            support_file = cypress_dir / "support" / "e2e.js"
-            support_file.write_text("// Cypress support file\n")
-
-            # Write cypress config
-            config = {
-                "e2e": {
-                    "baseUrl": base_url,
-                    "supportFile": "cypress/support/e2e.js",
-                    "specPattern": "cypress/e2e/**/*.cy.{js,jsx,ts,tsx}",
-                    "video": False,
-                    "screenshotOnRunFailure": True,
-                    "defaultCommandTimeout": timeout
-                }
-            }
-            config_file = temp_path / "cypress.config.js"
-            config_file.write_text(f"module.exports = {json.dumps(config, indent=2)}")
-
+        cypress_cmd = self.cli_command("cypress")
+        if cypress_cmd is None:
+            return self._cli_not_found("cypress")
+        workspace = self._cypress_workspace
+        spec_file = workspace / "cypress" / "e2e" / f"test_{uuid.uuid4().hex}.cy.js"
+        # Spec writes and cleanup touch the disk, so keep them off the event loop
+        await asyncio.to_thread(spec_file.write_text, spec_content)
+        try:
             # Build command
             cmd = [
-                "npx", "cypress", "run",
+                *cypress_cmd, "run",
+                "--project", str(workspace),
                 "--browser", browser,
                 "--spec", str(spec_file)
             ]
             if headless:
                 cmd.append("--headless")
 
-            # Run cypress
-            result = await self._run_process(cmd, temp_path, timeout // 1000 + 30)
-
-            return result
+            # Run cypress; config goes through the environment because --config
+            # splits on commas, which a base URL may contain
+            return await self._run_process(
+                cmd, timeout // 1000 + 30,
+                env={"CYPRESS_BASE_URL": base_url, "CYPRESS_defaultCommandTimeout": str(timeout)},
+                on_output=on_output
+            )
+        finally:
+            await asyncio.to_thread(
+                self._remove_run_files, spec_file, workspace / "cypress" / "screenshots" / spec_file.name
+            )
 
     async def run_playwright(
         self,
@@ -92,7 +186,8 @@ class TestRunner:
         base_url: str,
         browser: str = "chromium",
         headless: bool = True,
-        timeout: int = 60000
+        timeout: int = 60000,
+        on_output: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Run a Playwright test from spec content
@@ -103,38 +198,76 @@ class TestRunner:
             browser: Browser to use (chromium, firefox, webkit)
             headless: Run in headless mode
             timeout: Test timeout in ms
+            on_output: Called with each line of output as the test produces it
         """
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Write spec file
-            spec_file = temp_path / "test.spec.js"
-            spec_file.write_text(spec_content)
-
-            # Write playwright config
-            config_content = f"""
-const {{ defineConfig }} = require('@playwright/test');
-
-module.exports = defineConfig({{
-  testDir: '.',
-  timeout: {timeout},
-  use: {{
-    baseURL: '{base_url}',
-    headless: {str(headless).lower()},
-    browserName: '{browser}',
-  }},
-}});
-"""
-            config_file = temp_path / "playwright.config.js"
-            config_file.write_text(config_content)
-
-            # Build command
-            cmd = ["npx", "playwright", "test", str(spec_file)]
+        playwright_cmd = self.cli_command("playwright")
+        if playwright_cmd is None:
+            return self._cli_not_found("playwright")
+        workspace = self._playwright_workspace
+        run_id = uuid.uuid4().hex
+        spec_file = workspace / f"test_{run_id}.spec.js"
+        output_dir = workspace / "test-results" / run_id
+        # The JSON reporter writes once the run ends, after Playwright has emptied output_dir
+        report_file = output_dir / "results.json"
+        await asyncio.to_thread(spec_file.write_text, spec_content)
+        try:
+            # Build command; each run gets its own output dir since Playwright empties it on start
+            cmd = [
+                *playwright_cmd, "test", spec_file.name,
+                "--config", str(workspace / "playwright.config.js"),
+                "--browser", browser,
+                "--timeout", str(timeout),
+                "--output", str(output_dir),
+                "--reporter", "list,json"
+            ]
+            if not headless:
+                cmd.append("--headed")
 
             # Run playwright
-            result = await self._run_process(cmd, temp_path, timeout // 1000 + 30)
-
+            result = await self._run_process(
+                cmd, timeout // 1000 + 30,
+                env={"PLAYWRIGHT_BASE_URL": base_url, "PLAYWRIGHT_JSON_OUTPUT_NAME": str(report_file)},
+                on_output=on_output
+            )
+            result["results"] = await asyncio.to_thread(self._read_report, report_file)
             return result
+        finally:
+            await asyncio.to_thread(self._remove_run_files, spec_file, output_dir)
+
+    async def run_batch(
+        self,
+        items: List[Dict[str, Any]],
+        framework: TestFramework,
+        concurrency: int = 4
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several specs concurrently and return their results in order
+
+        Args:
+            items: Keyword arguments for run_cypress/run_playwright, one dict per spec
+            framework: Framework that runs every spec in the batch
+            concurrency: Most runs (and so browsers) alive at once
+        """
+        run = self.run_cypress if framework == TestFramework.CYPRESS else self.run_playwright
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_item(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                # Per-item timeout so one hung browser cannot stall the whole batch
+                timeout = item.get("timeout", 60000) // 1000 + 30 + BATCH_TIMEOUT_MARGIN
+                return await asyncio.wait_for(run(**item), timeout=timeout)
+
+        results = await asyncio.gather(*(run_item(item) for item in items), return_exceptions=True)
+        return [
+            result if not isinstance(result, BaseException) else {
+                "success": False,
+                "error": "Test timed out" if isinstance(result, asyncio.TimeoutError) else str(result),
+                "stdout": "",
+                "stderr": "",
+                "exit_code": -1
+            }
+            for result in results
+        ]
 
     async def run_steps_as_cypress(
         self,
@@ -152,6 +285,10 @@ module.exports = defineConfig({{
             browser: Browser to use
             headless: Run in headless mode
         """
+        result = await self._run_without_browser(steps, CYPRESS_STEP_TEMPLATES)
+        if result is not None:
+            return result
+
         spec_content = self._steps_to_cypress(steps, base_url)
         return await self.run_cypress(spec_content, base_url, browser, headless)
 
@@ -165,106 +302,194 @@ module.exports = defineConfig({{
         """
         Convert test steps to Playwright spec and run
         """
+        result = await self._run_without_browser(steps, PLAYWRIGHT_STEP_TEMPLATES)
+        if result is not None:
+            return result
+
         spec_content = self._steps_to_playwright(steps, base_url)
         return await self.run_playwright(spec_content, base_url, browser, headless)
 
-    def _steps_to_cypress(self, steps: List[Dict[str, Any]], base_url: str) -> str:
-        """Convert test steps to Cypress spec content"""
-        lines = [
-            "describe('Test', () => {",
-            "  it('runs the test steps', () => {"
-        ]
+    @staticmethod
+    async def _run_without_browser(
+        steps: List[Dict[str, Any]],
+        templates: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Result for step lists that never touch the page, or None if a browser is needed
 
+        Steps the templates can't render are skipped anyway, so a list that is
+        empty or holds only waits is served here without launching a browser.
+        """
+        wait_ms = 0
         for step in steps:
-            step_type = step.get("type", "")
-            selector = step.get("selector", "")
-            value = step.get("value", "")
-
-            if step_type == "navigate":
-                url = step.get("url", base_url)
-                lines.append(f"    cy.visit('{url}');")
-            elif step_type == "click":
-                lines.append(f"    cy.get('{selector}').click();")
-            elif step_type == "type":
-                lines.append(f"    cy.get('{selector}').type('{value}');")
-            elif step_type == "verify":
-                lines.append(f"    cy.get('{selector}').should('exist');")
-            elif step_type == "wait":
-                wait_time = step.get("duration", 1000)
-                lines.append(f"    cy.wait({wait_time});")
-
-        lines.extend([
-            "  });",
-            "});"
-        ])
-
-        return "\n".join(lines)
+            step_type = step.get("type")
+            if step_type not in templates:
+                continue
+            if step_type != "wait":
+                return None
+            duration = step.get("duration")
+            wait_ms += 1000 if duration is None else duration
+
+        if wait_ms:
+            await asyncio.sleep(wait_ms / 1000)
+        return {
+            "success": True,
+            "stdout": "",
+            "stderr": "",
+            "exit_code": 0,
+            "error": None
+        }
+
+    @staticmethod
+    def _create_cypress_workspace() -> Path:
+        """Create a minimal Cypress project that lives for the whole process"""
+        workspace = Path(tempfile.mkdtemp(prefix="cypress_ws_"))
+        atexit.register(shutil.rmtree, workspace, ignore_errors=True)
+
+        cypress_dir = workspace / "cypress"
+        (cypress_dir / "e2e").mkdir(parents=True)
+        (cypress_dir / "support").mkdir()
+        (cypress_dir / "support" / "e2e.js").write_text("// Cypress support file\n")
+
+        config_file = workspace / "cypress.config.js"
+        config_file.write_text(f"module.exports = {json.dumps(CYPRESS_CONFIG, indent=2)}")
+
+        return workspace
+
+    @staticmethod
+    def _create_playwright_workspace() -> Path:
+        """Create a Playwright project directory that lives for the whole process"""
+        workspace = Path(tempfile.mkdtemp(prefix="playwright_ws_"))
+        atexit.register(shutil.rmtree, workspace, ignore_errors=True)
+
+        (workspace / "playwright.config.js").write_text(PLAYWRIGHT_CONFIG)
+
+        return workspace
+
+    @staticmethod
+    def _read_report(report_file: Path) -> Optional[Dict[str, Any]]:
+        """Parsed JSON reporter output, or None if the run didn't produce one"""
+        try:
+            return orjson.loads(report_file.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _remove_run_files(spec_file: Path, artifacts_dir: Path) -> None:
+        """Delete a finished run's spec and the artifacts it left in the workspace"""
+        spec_file.unlink(missing_ok=True)
+        shutil.rmtree(artifacts_dir, ignore_errors=True)
+
+    @staticmethod
+    def _render_steps(
+        templates: Dict[str, str],
+        header: str,
+        footer: str,
+        steps: List[Dict[str, Any]],
+        base_url: str
+    ) -> str:
+        """Render steps through per-type templates between a spec header and footer"""
+        buffer = io.StringIO()
+        write = buffer.write
+        write(header)
+        for step in steps:
+            template = templates.get(step.get("type"))
+            if template is None:
+                continue
+            url = step.get("url")
+            duration = step.get("duration")
+            write(template.format(
+                url=json.dumps(base_url if url is None else url),
+                selector=json.dumps(step.get("selector") or ""),
+                value=json.dumps(step.get("value") or ""),
+                duration=json.dumps(1000 if duration is None else duration)
+            ))
+        write(footer)
+
+        return buffer.getvalue()
+
+    def _steps_to_cypress(self, steps: List[Dict[str, Any]], base_url: str) -> str:
+        """Convert test steps to Cypress spec content"""
+        return self._render_steps(
+            CYPRESS_STEP_TEMPLATES, CYPRESS_SPEC_HEADER, CYPRESS_SPEC_FOOTER, steps, base_url
+        )
 
     def _steps_to_playwright(self, steps: List[Dict[str, Any]], base_url: str) -> str:
         """Convert test steps to Playwright spec content"""
-        lines = [
-            "const { test, expect } = require('@playwright/test');",
-            "",
-            "test('runs the test steps', async ({ page }) => {"
-        ]
-
-        for step in steps:
-            step_type = step.get("type", "")
-            selector = step.get("selector", "")
-            value = step.get("value", "")
-
-            if step_type == "navigate":
-                url = step.get("url", base_url)
-                lines.append(f"  await page.goto('{url}');")
-            elif step_type == "click":
-                lines.append(f"  await page.click('{selector}');")
-            elif step_type == "type":
-                lines.append(f"  await page.fill('{selector}', '{value}');")
-            elif step_type == "verify":
-                lines.append(f"  await expect(page.locator('{selector}')).toBeVisible();")
-            elif step_type == "wait":
-                wait_time = step.get("duration", 1000)
-                lines.append(f"  await page.waitForTimeout({wait_time});")
-
-        lines.append("});")
-
-        return "\n".join(lines)
+        return self._render_steps(
+            PLAYWRIGHT_STEP_TEMPLATES, PLAYWRIGHT_SPEC_HEADER, PLAYWRIGHT_SPEC_FOOTER, steps, base_url
+        )
 
     async def _run_process(
         self,
         cmd: List[str],
-        cwd: Path,
-        timeout: int
+        timeout: int,
+        env: Optional[Dict[str, str]] = None,
+        on_output: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
-        """Run a subprocess and capture output"""
+        """Run a subprocess and capture output, with env added to the inherited environment"""
         try:
+            # No cwd and no close_fds keeps Popen on its posix_spawn path instead of fork+exec
+            # (workspaces are passed as --project/--config); Python's own fds are already
+            # non-inheritable, so closing them in the child is redundant
             process = await asyncio.create_subprocess_exec(
                 *cmd,
-                cwd=str(cwd),
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
-                env={**os.environ, "CI": "true"}
+                env={**self._child_env, **env} if env else self._child_env,
+                close_fds=False,
+                limit=OUTPUT_LINE_LIMIT
             )
 
+            stdout: List[str] = []
+            stderr: List[str] = []
+
+            async def drain(reader: asyncio.StreamReader, sink: List[str]) -> None:
+                # Decode line by line as output arrives rather than all at exit
+                async for raw_line in reader:
+                    line = raw_line.decode("utf-8", errors="replace")
+                    sink.append(line)
+                    if on_output is not None:
+                        on_output(line)
+
+            drains = [
+                asyncio.ensure_future(drain(process.stdout, stdout)),
+                asyncio.ensure_future(drain(process.stderr, stderr)),
+            ]
+            error = None
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
+                await asyncio.wait_for(
+                    asyncio.gather(*drains, process.wait()),
                     timeout=timeout
                 )
             except asyncio.TimeoutError:
-                process.kill()
+                error = "Test timed out"
+            except ValueError:
+                # StreamReader raises this for a line longer than OUTPUT_LINE_LIMIT
+                error = "Test output line exceeded the read limit"
+            finally:
+                # Whatever ended the wait (including cancellation), don't leave the
+                # browser running or its process unreaped
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                for task in drains:
+                    task.cancel()
+                await asyncio.gather(*drains, return_exceptions=True)
+
+            if error is not None:
                 return {
                     "success": False,
-                    "error": "Test timed out",
-                    "stdout": "",
-                    "stderr": "",
+                    "error": error,
+                    "stdout": "".join(stdout),
+                    "stderr": "".join(stderr),
                     "exit_code": -1
                 }
 
             return {
                 "success": process.returncode == 0,
-                "stdout": stdout.decode("utf-8", errors="replace"),
-                "stderr": stderr.decode("utf-8", errors="replace"),
+                "stdout": "".join(stdout),
+                "stderr": "".join(stderr),
                 "exit_code": process.returncode,
                 "error": None if process.returncode == 0 else "Test failed"
             }
@@ -272,7 +497,7 @@ module.exports = defineConfig({{
         except FileNotFoundError:
             return {
                 "success": False,
-                "error": "npx not found. Make sure Node.js is installed.",
+                "error": f"{Path(cmd[0]).name} not found. Make sure Node.js is installed.",
                 "stdout": "",
                 "stderr": "",
                 "exit_code": -1
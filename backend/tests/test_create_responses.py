@@ -0,0 +1,39 @@
+"""
+Create endpoints must return rows exactly as a later GET reads them back
+"""
+import os
+import tempfile
+
+# Point the app at a throwaway database before it is imported
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+def test_create_project_matches_get():
+    with TestClient(app) as client:
+        created = client.post(
+            "/api/projects", json={"name": "Demo", "app_url": "http://localhost:3000"}
+        )
+        assert created.status_code == 200
+        fetched = client.get(f"/api/projects/{created.json()['id']}")
+
+    assert fetched.status_code == 200
+    assert created.json() == fetched.json()
+
+
+def test_create_test_case_matches_get():
+    with TestClient(app) as client:
+        project = client.post(
+            "/api/projects", json={"name": "Demo", "app_url": "http://localhost:3000"}
+        ).json()
+        created = client.post(
+            "/api/test-cases", json={"project_id": project["id"], "name": "Login"}
+        )
+        assert created.status_code == 200
+        fetched = client.get(f"/api/test-cases/{created.json()['id']}")
+
+    assert fetched.status_code == 200
+    assert created.json() == fetched.json()
@@ -0,0 +1,28 @@
+"""
+Deleting a parent row must remove its children through ON DELETE CASCADE
+"""
+import os
+import tempfile
+
+# Point the app at a throwaway database before it is imported
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+def test_delete_project_removes_test_cases():
+    with TestClient(app) as client:
+        project = client.post(
+            "/api/projects", json={"name": "Demo", "app_url": "http://localhost:3000"}
+        ).json()
+        test_case = client.post(
+            "/api/test-cases", json={"project_id": project["id"], "name": "Login"}
+        ).json()
+
+        deleted = client.delete(f"/api/projects/{project['id']}")
+        assert deleted.status_code == 200
+
+        assert client.get(f"/api/test-cases/{test_case['id']}").status_code == 404
+        assert client.get(f"/api/test-cases/project/{project['id']}").json() == []